@@ -1,11 +1,19 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
 
+# Compile cpus.db (upgraded to the current schema) into the snapshot the app loads.
+# Only the snapshot is bundled: the frozen app never opens cpus.db.
+sys.path.insert(0, SPECPATH)
+import catalog
+catalog.build_snapshot(os.path.join(SPECPATH, 'resources', 'cpus.db'))
 
 a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[('templates', 'templates'), ('static', 'static'), ('resources', 'resources')],
+    datas=[('templates', 'templates'), ('static', 'static'),
+           ('resources/logo.png', 'resources'), ('resources/cpus.snapshot', 'resources')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
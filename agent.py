@@ -0,0 +1,143 @@
+"""
+Headless fleet scan agent.
+
+Scans this machine and posts a compact JSON report to a central build sheet server
+(app.py started with BUILD_SHEET_HOST=0.0.0.0), which prices it and queues its build sheet.
+Only needs the scanner's dependencies: no Flask, no reportlab.
+The server only takes reports from other machines with its BUILD_SHEET_FLEET_TOKEN, passed
+as --token or the same environment variable here.
+
+    python agent.py http://buildsheet-server:8888 --token s3cret
+    python agent.py http://localhost:8888 --simulate 50    # 50 fake machines reporting at once
+    python agent.py - > report.json                         # just print the report
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import platform
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import scanner
+
+REPORT_VERSION = 1
+INGEST_PATH = '/api/fleet/reports'
+
+# Scanned fields the server prices from; the rest of get_system_info stays on the machine
+REPORT_FIELDS = ('cpu_name', 'cpu_cores', 'cpu_threads', 'ram_gb', 'ram_type', 'gpu_list', 'gpu_name',
+                 'os_name', 'is_laptop', 'serial_number')
+DRIVE_FIELDS = ('device', 'capacity_gb', 'type', 'model')
+
+# Machines for --simulate, one of each common shape on a refurb cart
+SIMULATED_MACHINES = [
+    {'cpu_name': "Intel(R) Core(TM) i5-6500 CPU @ 3.20GHz", 'ram_gb': 8, 'ram_type': "DDR4",
+     'drives': [{'capacity_gb': 238.47, 'type': "SSD"}], 'os_name': "Linux Mint 21.2", 'is_laptop': False},
+    {'cpu_name': "Intel(R) Core(TM) i7-7600U CPU @ 2.80GHz", 'ram_gb': 16, 'ram_type': "DDR4",
+     'drives': [{'capacity_gb': 476.94, 'type': "NVMe"}], 'os_name': "Ubuntu 22.04.3 LTS", 'is_laptop': True},
+    {'cpu_name': "AMD Ryzen 5 3600 6-Core Processor", 'ram_gb': 16, 'ram_type': "DDR4",
+     'drives': [{'capacity_gb': 465.76, 'type': "SSD"}, {'capacity_gb': 931.51, 'type': "HDD"}],
+     'os_name': "Windows 10 Pro 22H2", 'is_laptop': False},
+    {'cpu_name': "Intel(R) Core(TM)2 Duo CPU E8400 @ 3.00GHz", 'ram_gb': 4, 'ram_type': "DDR3",
+     'drives': [{'capacity_gb': 232.89, 'type': "HDD"}], 'os_name': "Linux Mint 21.2", 'is_laptop': False},
+    {'cpu_name': "11th Gen Intel(R) Core(TM) i5-1135G7 @ 2.40GHz", 'ram_gb': 8, 'ram_type': "DDR4",
+     'drives': [{'capacity_gb': 238.47, 'type': "NVMe"}], 'os_name': "Windows 11 Pro 23H2", 'is_laptop': True},
+]
+
+def build_report(info, host=None, model=None):
+    """Compact report from a get_system_info dict"""
+    specs = {field: info[field] for field in REPORT_FIELDS if field in info}
+    specs['drives'] = [{field: drive[field] for field in DRIVE_FIELDS if field in drive}
+                       for drive in info.get('drives', [])]
+    agent_report = {
+        'v': REPORT_VERSION,
+        'host': host or platform.node(),
+        'specs': specs,
+    }
+    if model:
+        agent_report['model'] = model
+    if 'probe_timings' in info:
+        agent_report['scan_seconds'] = max((t['seconds'] for t in info['probe_timings'].values()), default=0)
+    return agent_report
+
+def simulated_report(n):
+    """Report for simulated machine n (serial SIM-00001, ...)"""
+    info = dict(SIMULATED_MACHINES[n % len(SIMULATED_MACHINES)])
+    info['serial_number'] = f"SIM-{n:05d}"
+    return build_report(info, host=f"sim-{n:05d}", model="Simulated")
+
+def post_reports(server, reports, timeout=30, retries=3, token=None):
+    """
+    Posts reports to the server in one request, with the fleet token if given. Returns the server's reply.
+    Connection problems are retried with backoff (the whole cart tends to boot at once).
+    """
+    body = json.dumps({'reports': reports}, separators=(',', ':')).encode('utf-8')
+    url = server.rstrip('/') + INGEST_PATH
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f"Bearer {token}"
+    for attempt in range(retries + 1):
+        request = urllib.request.Request(url, data=body, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            # The server answered; retrying the same report won't change its mind
+            try:
+                return json.loads(e.read())
+            except ValueError:
+                return {'success': False, 'error': f"HTTP {e.code}"}
+        except (urllib.error.URLError, OSError) as e:
+            if attempt == retries:
+                return {'success': False, 'error': str(e)}
+            time.sleep(0.5 * 2 ** attempt)
+
+def simulate(server, count, workers=None, batch=False, token=None):
+    """
+    count simulated agents reporting to server at once (one request each, or one request for all with batch).
+    Returns (replies, seconds).
+    """
+    reports = [simulated_report(n) for n in range(1, count + 1)]
+    start = time.perf_counter()
+    if batch:
+        replies = [post_reports(server, reports, token=token)]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers or count) as pool:
+            replies = list(pool.map(lambda r: post_reports(server, [r], token=token), reports))
+    return replies, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan this machine and report it to a build sheet server")
+    parser.add_argument('server', help="server URL, e.g. http://buildsheet-server:8888 (- to print the report)")
+    parser.add_argument('--simulate', type=int, metavar='N', help="send N simulated machines instead of scanning")
+    parser.add_argument('--batch', action='store_true', help="with --simulate, send all machines in one request")
+    parser.add_argument('--token', default=os.environ.get('BUILD_SHEET_FLEET_TOKEN'),
+                        help="the server's fleet token (default: $BUILD_SHEET_FLEET_TOKEN)")
+    args = parser.parse_args()
+
+    if args.simulate:
+        replies, elapsed = simulate(args.server, args.simulate, batch=args.batch, token=args.token)
+        failed = [reply for reply in replies if not reply.get('success')]
+        machines = sum(len(reply.get('jobs', [])) for reply in replies)
+        print(f"{machines} machines reported in {elapsed:.2f}s ({len(failed)} failed requests)")
+        for reply in failed[:5]:
+            print(f"  {reply.get('error')}")
+        sys.exit(1 if failed else 0)
+
+    info = scanner.get_system_info()
+    agent_report = build_report(info, model=scanner.read_dmi('product_name'))
+    if args.server == '-':
+        print(json.dumps(agent_report, indent=2))
+        return
+
+    reply = post_reports(args.server, [agent_report], token=args.token)
+    if not reply.get('success'):
+        print(f"Report failed: {reply.get('error')}", file=sys.stderr)
+        sys.exit(1)
+    for job in reply['jobs']:
+        print(f"Queued build sheet #{job['id']}: {job['cpu_model'] or info.get('cpu_name')} - ${job['final_price']:.0f}")
+
+if __name__ == "__main__":
+    main()
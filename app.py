@@ -1,11 +1,17 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 import scanner
 import pricing
 import report
+import fleet
+import hmac
+import io
+import ipaddress
 import os
 import json
 import socket
+import subprocess
 import sys
+import threading
 
 if getattr(sys, 'frozen', False):
     # Running in a bundle
@@ -16,50 +22,141 @@ else:
     # Running in normal python environment
     app = Flask(__name__)
 
+# Where /api/generate-pdf keeps copies of build sheets when asked to (save_copy / open_viewer)
+SHEET_OUTPUT_DIR = os.environ.get('BUILD_SHEET_OUTPUT_DIR', 'build_sheets')
+
+# Shared secret for requests from other machines (fleet agents send it with --token).
+# Without it, only this machine may use the fleet and scan APIs or save copies of build sheets.
+FLEET_TOKEN = os.environ.get('BUILD_SHEET_FLEET_TOKEN', '')
+
+def is_loopback(address):
+    """True for localhost and loopback IPs (127.0.0.0/8, ::1, ::ffff:127.0.0.1)"""
+    if address == 'localhost':
+        return True
+    try:
+        ip = ipaddress.ip_address(address or '')
+    except ValueError:
+        return False
+    mapped = getattr(ip, 'ipv4_mapped', None)
+    return ip.is_loopback or bool(mapped and mapped.is_loopback)
+
+def request_authorized():
+    """True for requests from this machine, or carrying the fleet token (Authorization: Bearer or X-Fleet-Token)"""
+    if is_loopback(request.remote_addr):
+        return True
+    auth = request.headers.get('Authorization', '')
+    token = auth[len('Bearer '):].strip() if auth.startswith('Bearer ') else request.headers.get('X-Fleet-Token', '')
+    return bool(FLEET_TOKEN) and hmac.compare_digest(token.encode('utf-8'), FLEET_TOKEN.encode('utf-8'))
+
+def unauthorized():
+    return jsonify({
+        'success': False,
+        'error': 'Requests from other machines need the fleet token (BUILD_SHEET_FLEET_TOKEN)'
+    }), 401
+
 @app.route('/')
 def index():
     """Serve the main web interface"""
     return render_template('index.html')
 
+def price_scan(specs, cpu_candidates=None):
+    """CPU candidates and initial pricing for freshly scanned specs (the /api/scan response)"""
+    # Get CPU candidates using fuzzy search
+    if cpu_candidates is None:
+        cpu_candidates = pricing.get_cpu_candidates(specs.get('cpu_name', ''))
+    
+    # Calculate initial pricing (uses best match by default)
+    specs['gpu_price'] = 0.0  # Default GPU price
+    
+    # If we have candidates, use the first one as the specific model for initial calculation
+    if cpu_candidates:
+        specs['cpu_model_name'] = cpu_candidates[0]['name']
+        
+    price_data = pricing.calculate_price(specs)
+    
+    return {
+        'success': True,
+        'specs': specs,
+        'cpu_candidates': cpu_candidates,
+        'pricing': price_data
+    }
+
 @app.route('/api/scan', methods=['POST'])
 def scan_hardware():
-    """Scan hardware and return specs as JSON"""
+    """
+    Scan hardware and return specs as JSON.
+    Reuses the scan from this boot unless the body has "force": true;
+    "refresh": true returns the cached scan and rescans in the background.
+    """
+    if not request_authorized():
+        return unauthorized()
     try:
-        specs = scanner.get_system_info()
-        
-        # Get CPU candidates using fuzzy search
-        cpu_candidates = pricing.get_cpu_candidates(specs.get('cpu_name', ''))
-        
-        # Calculate initial pricing (uses best match by default)
-        specs['gpu_price'] = 0.0  # Default GPU price
-        
-        # If we have candidates, use the first one as the specific model for initial calculation
-        if cpu_candidates:
-            specs['cpu_model_name'] = cpu_candidates[0]['name']
-            
-        price_data = pricing.calculate_price(specs)
-        
-        return jsonify({
-            'success': True,
-            'specs': specs,
-            'cpu_candidates': cpu_candidates,
-            'pricing': price_data
-        })
+        data = request.get_json(silent=True) or {}
+        specs = scanner.get_cached_system_info(force=bool(data.get('force')), refresh=bool(data.get('refresh')))
+        return jsonify(price_scan(specs))
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/scan-stream', methods=['GET'])
+def scan_hardware_stream():
+    """
+    Server-Sent Events version of /api/scan (?force=1 to rescan), so the form fills in as probes finish:
+        probe           {probe, fields, timing} for each probe, as soon as it's done
+        cpu_candidates  {cpu_candidates} once the CPU name is known
+        result          the /api/scan response, with the first price estimate
+        done            end of stream
+    """
+    if not request_authorized():
+        return unauthorized()
+    force = request.args.get('force') in ('1', 'true')
+    
+    def events():
+        try:
+            cpu_candidates = None
+            for name, fields, timing in scanner.iter_cached_system_info(force=force):
+                if name is None:
+                    yield sse_event('result', price_scan(fields, cpu_candidates))
+                    break
+                yield sse_event('probe', {'probe': name, 'fields': fields, 'timing': timing})
+                if 'cpu_name' in fields:
+                    cpu_candidates = pricing.get_cpu_candidates(fields['cpu_name'])
+                    yield sse_event('cpu_candidates', {'cpu_candidates': cpu_candidates})
+        except Exception as e:
+            yield sse_event('result', {'success': False, 'error': str(e)})
+        yield sse_event('done', {})
+    
+    # No caching or proxy buffering, each event has to reach the browser right away
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Most CPU candidates or completions one search returns
+MAX_SEARCH_RESULTS = 50
+
 @app.route('/api/search-cpu', methods=['POST'])
 def search_cpu():
-    """Search for CPU candidates by name/query"""
+    """Search for CPU candidates by name/query ("limit": 1 to MAX_SEARCH_RESULTS, default 20)"""
     try:
         data = request.json
         query = data.get('query', '')
-        limit = data.get('limit', 20)
+        try:
+            limit = int(data.get('limit', 20))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': "'limit' must be an integer"
+            }), 400
+        # Each distinct limit is its own entry in the ranking cache, and a huge one ranks the whole catalog
+        limit = max(1, min(limit, MAX_SEARCH_RESULTS))
         
         candidates = pricing.get_cpu_candidates(query, limit=limit)
+        # Laptop/desktop CPU prices come from the CPU price table
+        pricing.add_cpu_prices(candidates)
         
         return jsonify({
             'success': True,
@@ -71,6 +168,30 @@ def search_cpu():
             'error': str(e)
         }), 500
 
+@app.route('/api/cpu-autocomplete', methods=['GET'])
+def cpu_autocomplete():
+    """Completions for a partially typed CPU name (search-as-you-type)"""
+    try:
+        query = request.args.get('q', '')
+        limit = max(1, min(request.args.get('limit', 10, type=int), MAX_SEARCH_RESULTS))
+        
+        completions = pricing.autocomplete_cpu(query, limit=limit)
+        
+        # Same query, same catalog, same answer: let the browser reuse it while the user retypes
+        response = jsonify({
+            'success': True,
+            'completions': completions
+        })
+        response.cache_control.public = True
+        response.cache_control.max_age = 300
+        response.add_etag()
+        return response.make_conditional(request)
+    except Exception as e:
+         return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/recalculate-price', methods=['POST'])
 def recalculate_price():
     """Recalculate price based on updated specs (e.g. manual CPU selection)"""
@@ -95,11 +216,45 @@ def recalculate_price():
             'error': str(e)
         }), 500
 
+def open_pdf_viewer(path):
+    """Opens a PDF in the desktop's viewer without waiting for the viewer to exit"""
+    try:
+        if os.name == 'nt':  # Windows
+            os.startfile(path)
+        elif os.uname().sysname == 'Darwin':  # macOS
+            subprocess.Popen(['open', path])
+        else:  # Linux and others
+            subprocess.Popen(['xdg-open', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        print(f"Could not open PDF automatically: {e}")
+
+def save_sheet_copy(pdf_bytes, path, open_viewer=False):
+    """Writes a build sheet to path (and opens it) on a background thread, so the request doesn't wait"""
+    def save():
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(pdf_bytes)
+        except OSError as e:
+            print(f"Could not save build sheet {path}: {e}")
+            return
+        if open_viewer:
+            open_pdf_viewer(path)
+    threading.Thread(target=save, name='save-sheet', daemon=True).start()
+
 @app.route('/api/generate-pdf', methods=['POST'])
 def generate_pdf():
-    """Generate PDF with custom data"""
+    """
+    Generate PDF with custom data. Replies with the PDF itself (application/pdf), generated in memory.
+    With "save_copy": true a copy is also written to SHEET_OUTPUT_DIR under a unique name, and
+    "open_viewer": true (implies save_copy) opens that copy in the desktop's PDF viewer; both happen
+    after the reply, and the copy's path is in the X-Build-Sheet-Path header. Those two write to this
+    machine, so other machines need the fleet token for them.
+    """
     try:
         data = request.json
+        if (data.get('save_copy') or data.get('open_viewer')) and not request_authorized():
+            return unauthorized()
         
         # Extract specs and custom fields
         specs = data.get('specs', {})
@@ -153,35 +308,78 @@ def generate_pdf():
         # Update custom fields with include_gpu for report.py
         custom_fields['include_gpu'] = include_gpu
 
-        # Generate PDF
-        pdf_path = report.generate_pdf(specs, price_data, custom_fields)
-        
-        # Open PDF automatically
-        abs_path = os.path.abspath(pdf_path)
-        try:
-            if os.name == 'nt':  # Windows
-                os.startfile(abs_path)
-            elif os.uname().sysname == 'Darwin':  # macOS
-                import subprocess
-                subprocess.run(['open', abs_path])
-            else:  # Linux and others
-                import subprocess
-                subprocess.run(['xdg-open', abs_path], check=False)
-        except Exception as e:
-            print(f"Could not open PDF automatically: {e}")
-        
+        # Generate PDF, in memory: concurrent requests never share a file
+        pdf_bytes = report.render_pdf(specs, price_data, custom_fields)
+        filename = report.sheet_filename(custom_fields['serial_number'])
+
+        response = send_file(io.BytesIO(pdf_bytes), mimetype='application/pdf', download_name=filename)
+        response.headers['Cache-Control'] = 'no-store'
+        open_viewer = bool(data.get('open_viewer'))
+        if data.get('save_copy') or open_viewer:
+            path = os.path.abspath(os.path.join(SHEET_OUTPUT_DIR, filename))
+            save_sheet_copy(pdf_bytes, path, open_viewer)
+            response.headers['X-Build-Sheet-Path'] = path
+        return response
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/fleet/reports', methods=['POST'])
+def fleet_reports():
+    """
+    Ingest scan reports from fleet agents (agent.py): one report, or {"reports": [...]}.
+    Replies once the reports are priced; their build sheets are rendered in the background.
+    """
+    if not request_authorized():
+        return unauthorized()
+    try:
+        data = request.get_json(silent=True)
+        reports = data.get('reports') if isinstance(data, dict) and 'reports' in data else [data]
+        if not isinstance(reports, list):
+            raise ValueError("'reports' must be a list")
+        jobs = fleet.get_fleet().ingest(reports)
         return jsonify({
             'success': True,
-            'pdf_path': os.path.abspath(pdf_path)
+            'jobs': jobs
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
-        import traceback
-        traceback.print_exc()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/fleet/jobs', methods=['GET'])
+def fleet_jobs():
+    """Build sheet queue (?status=queued|rendering|done|error to filter)"""
+    if not request_authorized():
+        return unauthorized()
+    return jsonify({
+        'success': True,
+        'jobs': fleet.get_fleet().list_jobs(request.args.get('status'))
+    })
+
+@app.route('/api/fleet/jobs/<int:job_id>/pdf', methods=['GET'])
+def fleet_job_pdf(job_id):
+    """Download a rendered fleet build sheet"""
+    if not request_authorized():
+        return unauthorized()
+    job = fleet.get_fleet().get_job(job_id)
+    if job is None or job['status'] != 'done':
+        return jsonify({
+            'success': False,
+            'error': 'Build sheet not ready' if job else 'No such job'
+        }), 404
+    return send_file(job['pdf_path'], mimetype='application/pdf')
+
 def find_available_port(start_port=8888, max_attempts=100):
     """Find the first available port starting from start_port"""
     for port in range(start_port, start_port + max_attempts):
@@ -212,6 +410,17 @@ if __name__ == '__main__':
             print("Starting Build Sheet Generator Web Interface...")
             print(f"Open your browser and navigate to: http://localhost:{port}")
 
-        app.run(debug=True, port=port)
+        # Load the CPU catalog up front so the first scan doesn't pay for it (the price
+        # table prices each CPU on its first lookup)
+        pricing.get_catalog()
+
+        # Set BUILD_SHEET_HOST=0.0.0.0 to accept fleet agents from other machines
+        host = os.environ.get('BUILD_SHEET_HOST', '127.0.0.1')
+        # The debugger runs code for whoever can reach it, so it (and the reloader) is
+        # only on when the server is just reachable from this machine
+        debug = is_loopback(host) and os.environ.get('BUILD_SHEET_DEBUG', '1') != '0'
+        if not is_loopback(host) and not FLEET_TOKEN:
+            print("Warning: BUILD_SHEET_FLEET_TOKEN is not set, requests from other machines will be refused")
+        app.run(debug=debug, host=host, port=port)
     except Exception as e:
         print(f"Error starting server: {e}")
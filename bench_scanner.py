@@ -0,0 +1,114 @@
+"""
+Scan benchmark: replays recorded machines through the real scanner and reports how long the
+scan takes, in total and per probe.
+
+Each profile in fixtures/scanner/ is a probe host fixture for one machine (see probe_host): the
+command output, WMI/registry answers, sysfs files and psutil results its scan uses, with how long
+each takes. The shipped profiles are synthetic ("synthetic": true), written by hand to model a
+typical Windows desktop, macOS laptop and Linux desktop; --record adds real recordings. Replaying
+them runs the Windows, macOS and Linux code paths on any OS, at the fixture's speed, so a change
+that serializes probes or adds a slow call shows up in CI.
+
+    python bench_scanner.py                              # every profile, 3 runs each
+    python bench_scanner.py fixtures/scanner/windows_desktop.json --repeat 10
+    python bench_scanner.py --max-wall 3.5               # exit 1 if a profile's scan takes longer
+    python bench_scanner.py --record linux_vm            # record this machine as a new profile
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+import probe_host
+import scanner
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'scanner')
+
+def record_profile(name, profile_dir=PROFILE_DIR):
+    """Scans this machine through a RecordingHost and saves it as profile `name`. Returns the path."""
+    host = probe_host.RecordingHost(profile=name)
+    scanner.get_system_info(host=host)
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, name + '.json')
+    host.save(path)
+    return path
+
+def bench_profile(path, repeat=3, speed=1.0, budget=scanner.SCAN_BUDGET):
+    """
+    Replays one profile `repeat` times. Returns
+        {'profile', 'wall': [seconds per run], 'probes': {name: [seconds per run]},
+         'status': {name: last status}, 'missing': [calls not in the recording], 'info': last scan}
+    """
+    result = {'profile': None, 'wall': [], 'probes': {}, 'status': {}, 'missing': set(), 'info': None}
+    for _ in range(repeat):
+        host = probe_host.ReplayHost.load(path, speed)
+        start = time.perf_counter()
+        info = scanner.get_system_info(budget, host=host)
+        result['wall'].append(time.perf_counter() - start)
+        for name, timing in info['probe_timings'].items():
+            result['probes'].setdefault(name, []).append(timing['seconds'])
+            result['status'][name] = timing['status']
+        result['profile'] = host.profile or os.path.splitext(os.path.basename(path))[0]
+        result['missing'] |= host.missing
+        result['info'] = info
+    result['missing'] = sorted(result['missing'])
+    return result
+
+def print_results(results):
+    names = [name for name, _, _, _ in scanner.PROBES]
+    print(f"{'profile':<18} {'wall':>7} " + " ".join(f"{name:>9}" for name in names))
+    for result in results:
+        cells = []
+        for name in names:
+            seconds = statistics.median(result['probes'].get(name, [0]))
+            status = result['status'].get(name, 'ok')
+            cells.append(f"{seconds:>8.3f}" + (' ' if status == 'ok' else status[0].upper()))
+        print(f"{result['profile']:<18} {statistics.median(result['wall']):>7.3f} " + " ".join(cells))
+    print("Median seconds over the runs; T = probe timed out, E = probe failed")
+    for result in results:
+        for call in result['missing']:
+            print(f"  {result['profile']}: not in the recording: {call}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hardware scan against recorded machines")
+    parser.add_argument('profiles', nargs='*', help=f"profile files (default: {PROFILE_DIR}/*.json)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per profile (default: 3)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="multiplier for the recorded latencies (default: 1, 0 = no waiting)")
+    parser.add_argument('--budget', type=float, default=scanner.SCAN_BUDGET, help="scan budget in seconds")
+    parser.add_argument('--max-wall', type=float, metavar='SECONDS',
+                        help="exit 1 if a profile's median scan takes longer than this")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    parser.add_argument('--record', metavar='NAME', help="record this machine as profile NAME instead")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"Recorded {record_profile(args.record)}")
+        return
+
+    paths = args.profiles or sorted(glob.glob(os.path.join(PROFILE_DIR, '*.json')))
+    if not paths:
+        print(f"No profiles in {PROFILE_DIR}", file=sys.stderr)
+        sys.exit(1)
+    # Probes print their fallbacks (e.g. "WMI method failed"), keep them out of the results
+    with contextlib.redirect_stdout(sys.stderr):
+        results = [bench_profile(path, args.repeat, args.speed, args.budget) for path in paths]
+
+    if args.json:
+        print(json.dumps([{key: value for key, value in result.items() if key != 'info'} for result in results],
+                         indent=2))
+    else:
+        print_results(results)
+
+    if args.max_wall is not None:
+        slow = [result['profile'] for result in results if statistics.median(result['wall']) > args.max_wall]
+        if slow:
+            print(f"Slower than {args.max_wall}s: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,11 @@ echo.
 echo Installing PyInstaller...
 pip install pyinstaller
 
+echo.
+echo Building CPU catalog snapshot...
+python catalog.py snapshot
+if errorlevel 1 goto :End
+
 echo.
 echo Building Executable...
 echo This may take a minute...
@@ -34,7 +39,8 @@ pyinstaller --name "BuildSheetGen" ^
             --onefile ^
             --add-data "templates;templates" ^
             --add-data "static;static" ^
-            --add-data "resources;resources" ^
+            --add-data "resources\logo.png;resources" ^
+            --add-data "resources\cpus.snapshot;resources" ^
             --icon=NONE ^
             app.py
 
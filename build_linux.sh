@@ -44,6 +44,10 @@ if [ ! -f "$PYINSTALLER" ]; then
     exit 1
 fi
 
+echo
+echo "Building CPU catalog snapshot..."
+"$PYTHON" catalog.py snapshot || exit 1
+
 echo
 echo "Building Executable..."
 echo "This may take a minute..."
@@ -59,7 +63,8 @@ rm -f *.spec
             --onefile \
             --add-data "templates:templates" \
             --add-data "static:static" \
-            --add-data "resources:resources" \
+            --add-data "resources/logo.png:resources" \
+            --add-data "resources/cpus.snapshot:resources" \
             --icon=NONE \
             app.py
 
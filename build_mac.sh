@@ -35,6 +35,10 @@ echo
 echo "Installing PyInstaller..."
 pip install pyinstaller
 
+echo
+echo "Building CPU catalog snapshot..."
+python catalog.py snapshot || exit 1
+
 echo
 echo "Building Executable..."
 echo "This may take a minute..."
@@ -50,7 +54,8 @@ pyinstaller --name "BuildSheetGen" \
             --onefile \
             --add-data "templates:templates" \
             --add-data "static:static" \
-            --add-data "resources:resources" \
+            --add-data "resources/logo.png:resources" \
+            --add-data "resources/cpus.snapshot:resources" \
             --icon=NONE \
             app.py
 
@@ -0,0 +1,1072 @@
+from array import array
+import bisect
+import collections.abc
+import functools
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import pathlib
+import re
+import sqlite3
+import struct
+import sys
+import threading
+
+# Bumped whenever build_catalog() changes what it adds to cpus.db
+CATALOG_SCHEMA_VERSION = 1
+
+def get_resource_path(filename):
+    """
+    Get absolute path to resource, works for dev and frozen app
+    """
+    if getattr(sys, 'frozen', False):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, 'resources', filename)
+
+def resolve_db_path(db_path='cpus.db'):
+    """
+    Resolves a bare database filename against the resources folder.
+    Absolute paths (and names not found in resources) are returned unchanged.
+    """
+    if not os.path.isabs(db_path):
+        res_path = get_resource_path(db_path)
+        # The frozen app ships only the snapshot (see BuildSheetGen.spec)
+        if os.path.exists(res_path) or os.path.exists(snapshot_path(res_path)):
+            return res_path
+    return db_path
+
+# (R), (TM), CPU, Processor and core/thread counts (e.g. 12-Core, 16-Thread), removed in one pass
+_CPU_NAME_NOISE = re.compile(
+    r'\(R\)|\(TM\)|\s+CPU\s*|\s+Processor\s*|\s+\d+-Core|\s+\d+-Thread',
+    re.IGNORECASE
+)
+
+@functools.lru_cache(maxsize=1024)
+def clean_cpu_name(name):
+    """
+    Cleans CPU name to improve matching success
+    e.g. "Intel(R) Core(TM) i7-7600U CPU @ 2.80GHz" -> "Intel Core i7-7600U"
+    Memoized, since scanners report the same few brand strings over and over.
+    """
+    if not name: return ""
+    name = _CPU_NAME_NOISE.sub('', name)
+    # Remove clock speed info if present (e.g. @ 2.80GHz)
+    name = name.split('@')[0]
+    # Remove extra spaces
+    return " ".join(name.split())
+
+def tokenize_name(name_clean):
+    """
+    Splits a normalized name into search tokens.
+    Runs of letters and digits, which is what the FTS5 unicode61 tokenizer produces.
+    """
+    return re.findall(r'[^\W_]+', name_clean)
+
+_CPU_VENDORS = ('intel', 'amd', 'apple', 'qualcomm', 'mediatek', 'arm', 'via', 'zhaoxin',
+                'samsung', 'hisilicon', 'nvidia', 'rockchip')
+# Family words that identify the vendor when the name doesn't start with it (e.g. "Ryzen 5 3500U")
+_FAMILY_VENDORS = {
+    'core': 'intel', 'core2': 'intel', 'xeon': 'intel', 'pentium': 'intel', 'celeron': 'intel', 'atom': 'intel',
+    'i3': 'intel', 'i5': 'intel', 'i7': 'intel', 'i9': 'intel',
+    'ryzen': 'amd', 'epyc': 'amd', 'athlon': 'amd', 'phenom': 'amd', 'opteron': 'amd', 'sempron': 'amd', 'turion': 'amd',
+}
+# Words that say nothing about the model
+_MODEL_NOISE = {'genuine', 'cpu', 'processor', 'apu'}
+# Trademarks and core/thread counts ("8-Core Processor"), which scanners add and the catalog leaves out
+_MODEL_MARKS = re.compile(r'\(R\)|\(TM\)|\b\d+-Core\b|\b\d+-Thread\b', re.IGNORECASE)
+# "11th Gen " prefix of recent Intel brand strings
+_GEN_PREFIX = re.compile(r'^\d+(?:st|nd|rd|th) gen ')
+# Model number: optional letter prefix, digits, anything after is the suffix (e.g. e8400, 1165g7, 6000+)
+_SKU = re.compile(r'^([a-z]*)(\d+)(.*)$')
+# Series words shaped like a model number: the A10 of "A10-9700", the E5 of "Xeon E5-2670"
+_SERIES = re.compile(r'^[a-z]+\d{1,2}$')
+_CLOCK = re.compile(r'^[\d.]+[gm]hz$')
+# Words with a digit are model numbers, which similar() never matches with typos
+_DIGIT = re.compile(r'\d')
+
+class CpuModel:
+    """
+    A CPU name broken into its parts, e.g. "Intel Xeon E5-2670 v2" ->
+    vendor 'intel', family 'xeon e5', sku '2670', suffix '', variant 'v2', generation 2.
+    key is the canonical form two names share when they are the same model.
+    """
+    __slots__ = ('vendor', 'family', 'generation', 'sku', 'suffix', 'variant', 'key')
+
+    def __init__(self, vendor, family, generation, sku, suffix, variant):
+        self.vendor = vendor
+        self.family = family
+        self.generation = generation
+        self.sku = sku
+        self.suffix = suffix
+        # Words after the model number, e.g. 'v2', 'he', 'creator edition'
+        self.variant = variant
+        self.key = " ".join(part for part in (vendor, family, sku + suffix, variant) if part)
+
+    def __repr__(self):
+        return f"CpuModel({self.key!r}, generation={self.generation})"
+
+def _model_generation(family, digits, suffix, variant):
+    """
+    Generation from the model number:
+    i7-7600U -> 7, i7-11390H -> 11, i7-1165G7 -> 11, i7-920 -> 1, Ryzen 5 3500U -> 3, Xeon v2 -> 2
+    """
+    if variant[:1] == 'v' and variant[1:].isdigit():
+        return int(variant[1:])
+    if family in ('i3', 'i5', 'i7', 'i9'):
+        if len(digits) == 5 or (len(digits) == 4 and digits[0] == '1' and suffix.startswith('g')):
+            return int(digits[:2])
+        return 1 if len(digits) == 3 else int(digits[0])
+    if family.startswith(('ryzen', 'core ultra')):
+        return int(digits[0])
+    return None
+
+def _is_sku(word):
+    return len(word) >= 3 and word not in _FAMILY_VENDORS and not _CLOCK.match(word) and _SKU.match(word)
+
+@functools.lru_cache(maxsize=1024)
+def parse_cpu_model(name):
+    """
+    Parses a CPU name (catalog name or scanner brand string) into a CpuModel.
+    Returns None if the name has no recognizable vendor and model number.
+    """
+    # Not clean_cpu_name(): that drops " CPU " together with the spaces around it ("XeonE5-2670")
+    name = _MODEL_MARKS.sub('', name or '').split('@')[0].lower()
+    # "AMD Ryzen 5 3500U with Radeon Vega Mobile Gfx" -> "amd ryzen 5 3500u"
+    name = _GEN_PREFIX.sub('', name.strip()).split(' with ')[0]
+    words = [w for w in name.replace('-', ' ').split() if w not in _MODEL_NOISE]
+    vendor = ''
+    if words and words[0] in _CPU_VENDORS:
+        vendor = words.pop(0)
+    family = []
+    match = None
+    for i, word in enumerate(words):
+        match = _is_sku(word)
+        if match and not (_SERIES.match(word) and i + 1 < len(words) and _is_sku(words[i + 1])):
+            break
+        match = None
+        family.append(word)
+    if match is None:
+        return None
+    prefix, digits, suffix = match.groups()
+    # First generation Xeon E5/E7 brand strings end in " 0" ("Xeon(R) CPU E5-2670 0 @ 2.60GHz")
+    variant = [w for w in words[i + 1:] if w != '0' and not _CLOCK.match(w)]
+    # "Core i7" and "i7" are the same family
+    if len(family) >= 2 and family[0] == 'core' and family[1] in ('i3', 'i5', 'i7', 'i9'):
+        family.pop(0)
+    if not vendor and family:
+        vendor = _FAMILY_VENDORS.get(family[0], '')
+    if not vendor:
+        return None
+    family = " ".join(family)
+    variant = " ".join(variant)
+    return CpuModel(vendor, family, _model_generation(family, digits, suffix, variant),
+                    prefix + digits, suffix, variant)
+
+class CpuRecord:
+    """
+    One row of the cpus table.
+    Supports item access (record['name']) so it can stand in for the old sqlite3.Row.
+    """
+    __slots__ = ('id', 'year', 'url', 'name', 'cores', 'threads', 'clock', 'turbo', 'passmark')
+
+    def __init__(self, id, year, url, name, cores, threads, clock, turbo, passmark):
+        self.id = id
+        self.year = year
+        self.url = url
+        self.name = name
+        self.cores = cores
+        self.threads = threads
+        self.clock = clock
+        self.turbo = turbo
+        self.passmark = passmark
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __repr__(self):
+        return f"CpuRecord({self.id}, {self.name!r})"
+
+    def to_dict(self):
+        """Same keys as dict(sqlite3.Row) for a SELECT * on the cpus table"""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+# Column layout of a catalog snapshot (see write_snapshot)
+_SNAPSHOT_INT_COLUMNS = ('id', 'year', 'cores', 'threads', 'passmark')
+_SNAPSHOT_FLOAT_COLUMNS = ('clock', 'turbo')
+
+class SnapshotRecords:
+    """
+    The rows of a catalog snapshot, read from its column arrays.
+    Behaves like the tuple of CpuRecords a CpuCatalog normally holds; each record is
+    built the first time it is accessed, so loading the snapshot doesn't build them all up front.
+    """
+
+    def __init__(self, columns, nulls, names, urls):
+        # column name -> memoryview of the values, for the numeric columns
+        self.columns = columns
+        # Bit i set: the i-th column of CpuRecord.__slots__ is NULL
+        self.nulls = nulls
+        self.names = names
+        # Callable: position -> url, decoded on demand
+        self.urls = urls
+        self._records = [None] * len(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, pos):
+        record = self._records[pos]
+        if record is None:
+            record = self._records[pos] = self._make_record(pos % len(self.names))
+        return record
+
+    def _make_record(self, pos):
+        columns = self.columns
+        values = {key: columns[key][pos] for key in _SNAPSHOT_INT_COLUMNS + _SNAPSHOT_FLOAT_COLUMNS}
+        values['name'] = self.names[pos]
+        values['url'] = self.urls(pos)
+        null_bits = self.nulls[pos]
+        if null_bits:
+            for i, key in enumerate(CpuRecord.__slots__):
+                if null_bits & (1 << i):
+                    values[key] = None
+        return CpuRecord(**values)
+
+    def __iter__(self):
+        for pos in range(len(self.names)):
+            yield self[pos]
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def edit_distance(a, b, max_distance):
+    """
+    Edit distance between a and b, counting a swap of two neighbouring characters
+    ("xoen" / "xeon") as one edit, like a typo.
+    Stops early and returns max_distance + 1 once the distance is known to be larger.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if max_distance <= 1:
+        return _edit_distance_one(a, b, max_distance)
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            d = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                d = min(d, before[j - 2] + 1)
+            current.append(d)
+        if min(current) > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+def _edit_distance_one(a, b, max_distance):
+    """edit_distance() for max_distance 0 or 1, in one pass over the strings"""
+    if a == b:
+        return 0
+    if max_distance == 0:
+        return 1
+    i = 0
+    while i < len(a) and i < len(b) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        if a[i + 1:] == b[i + 1:]:
+            return 1
+        # Swapped neighbours
+        if a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2] and a[i + 2:] == b[i + 2:]:
+            return 1
+        return 2
+    if len(a) > len(b):
+        return 1 if a[i + 1:] == b[i:] else 2
+    return 1 if a[i:] == b[i + 1:] else 2
+
+def typo_budget(word):
+    """Edits allowed when matching word: none for short words like "i7", two for long ones"""
+    if len(word) < 3:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+def _deletes(word, depth):
+    """word and every string made by deleting up to depth characters from it"""
+    result = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+class FuzzyTokenIndex:
+    """
+    Finds the search tokens within typo_budget() edits of a word.
+    Symmetric-delete index: each token is filed under every string made by deleting up to
+    typo_budget(token) of its characters. Two words within d edits of each other always
+    share such a string, so a lookup is a handful of dict hits plus an edit_distance()
+    check of each hit, independent of how many tokens there are.
+    """
+
+    def __init__(self, tokens, deletes=None):
+        self.tokens = list(tokens)
+        if deletes is None:
+            # variant -> ids (positions in self.tokens) of the tokens it was made from
+            deletes = {}
+            for token_id, token in enumerate(self.tokens):
+                for variant in _deletes(token, typo_budget(token)):
+                    deletes.setdefault(variant, []).append(token_id)
+        self.deletes = deletes
+
+    def lookup(self, word):
+        """
+        Dict of token -> edit distance for the tokens close to word.
+        Both sides have to allow the edits: "i7-7600X" may match "7600U", "X5" may not match "X6".
+        """
+        budget = typo_budget(word)
+        tokens = self.tokens
+        matches = {}
+        for variant in _deletes(word, budget):
+            for token_id in self.deletes.get(variant, ()):
+                token = tokens[token_id]
+                if token not in matches:
+                    matches[token] = edit_distance(word, token, min(budget, typo_budget(token)))
+        return {token: d for token, d in matches.items() if d <= min(budget, typo_budget(token))}
+
+class CpuSearchIndex:
+    """
+    Inverted index over the catalog names.
+    Maps search tokens of the cleaned names and character trigrams of the lowercased
+    names to sorted arrays of row positions, so substring matches become set
+    intersections instead of full scans. A FuzzyTokenIndex over the tokens backs
+    the typo-tolerant similar().
+    """
+
+    def __init__(self, names_lower, names_clean, token_postings=None):
+        self.names = names_lower
+        trigrams = {}
+        for pos, name in enumerate(names_lower):
+            for gram in _trigrams(name):
+                trigrams.setdefault(gram, []).append(pos)
+        if token_postings is None:
+            token_postings = {}
+            for pos, name in enumerate(names_clean):
+                for token in set(tokenize_name(name)):
+                    token_postings.setdefault(token, []).append(pos)
+        # Positions were appended in order, so every posting list is already sorted
+        self.tokens = {k: array('I', v) for k, v in token_postings.items()}
+        self.trigrams = {k: array('I', v) for k, v in trigrams.items()}
+        self.fuzzy = FuzzyTokenIndex(k for k in self.tokens if typo_budget(k))
+        # token -> frozenset of its positions, made on first use by similar()
+        self._token_sets = {}
+
+    @classmethod
+    def from_snapshot(cls, names_lower, tokens, trigrams, fuzzy):
+        """Index over prebuilt postings (memoryviews into a catalog snapshot)"""
+        index = cls.__new__(cls)
+        index.names = names_lower
+        index.tokens = tokens
+        index.trigrams = trigrams
+        index.fuzzy = fuzzy
+        index._token_sets = {}
+        return index
+
+    def with_token(self, token):
+        """Positions of names that contain token as a whole search token"""
+        return self.tokens.get(token.lower(), ())
+
+    def _candidates(self, text):
+        """
+        Superset of the positions whose name contains text (text already lowercased).
+        Returns None when text is too short to filter by trigram.
+        """
+        grams = _trigrams(text)
+        if not grams:
+            return None
+        postings = []
+        for gram in grams:
+            posting = self.trigrams.get(gram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            # Once the candidate set is much smaller than the next posting list,
+            # checking the remaining candidates directly is cheaper than intersecting
+            if len(posting) > 8 * len(result):
+                break
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    def contains(self, text):
+        """Set of positions whose name contains text"""
+        text = text.lower()
+        candidates = self._candidates(text)
+        names = self.names
+        if candidates is None:
+            return {pos for pos, name in enumerate(names) if text in name}
+        return {pos for pos in candidates if text in names[pos]}
+
+    def startswith(self, text):
+        """Set of positions whose name starts with text"""
+        text = text.lower()
+        candidates = self._candidates(text)
+        names = self.names
+        if candidates is None:
+            return {pos for pos, name in enumerate(names) if name.startswith(text)}
+        return {pos for pos in candidates if names[pos].startswith(text)}
+
+    def contains_all(self, tokens):
+        """Set of positions whose name contains every token"""
+        result = None
+        for token in tokens:
+            matches = self.contains(token)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result or set()
+
+    def similar(self, text):
+        """
+        Typo-tolerant token match. Returns a dict of position -> total edit distance for the
+        names that have, for every word of text, a search token within typo_budget() edits.
+        Model numbers (words with a digit) must match a token exactly, and other words only
+        match tokens without digits: "i7-930" or "xy9" is a different CPU, not a typo.
+        """
+        words = []
+        for word in tokenize_name(text.lower()):
+            if _DIGIT.search(word):
+                if word not in self.tokens:
+                    return {}
+                matches = {word: 0}
+            else:
+                matches = self.fuzzy.lookup(word) if typo_budget(word) else {}
+                matches = {token: d for token, d in matches.items() if not _DIGIT.search(token)}
+            # Words nothing is close to (e.g. "cpu") don't narrow the search
+            if matches:
+                words.append(matches)
+        if not words:
+            return {}
+        # Start from the word with the fewest names, then keep the names that also match
+        # each other word, noting the closest token each one matched
+        words.sort(key=lambda matches: sum(len(self.tokens[token]) for token in matches))
+        distances = {}
+        for token, d in sorted(words[0].items(), key=lambda item: item[1]):
+            for pos in self.tokens[token]:
+                distances.setdefault(pos, d)
+        for matches in words[1:]:
+            remaining = distances
+            distances = {}
+            for token, d in sorted(matches.items(), key=lambda item: item[1]):
+                members = self._token_set(token)
+                for pos, total in remaining.items():
+                    if pos in members and pos not in distances:
+                        distances[pos] = total + d
+            if not distances:
+                break
+        return distances
+
+    def _token_set(self, token):
+        members = self._token_sets.get(token)
+        if members is None:
+            members = self._token_sets[token] = frozenset(self.tokens[token])
+        return members
+
+    def contains_any(self, tokens):
+        """Set of positions whose name contains at least one token"""
+        result = set()
+        for token in tokens:
+            result |= self.contains(token)
+        return result
+
+class CpuAutocomplete:
+    """
+    Prefix completion for search-as-you-type.
+    Every cleaned name is indexed from the start of each of its words, so "intel core i7-7600u"
+    is found by "intel co", "core i7", "i7 76" and "7600". Hyphens count as spaces.
+    The keys live in one sorted list searched with bisect; each key carries a precomputed rank
+    (names matched from their first word, then shorter names, then catalog order).
+    """
+
+    # Prefix ranges longer than this are ranked once and remembered
+    WIDE_RANGE = 256
+
+    def __init__(self, names_clean):
+        entries = []
+        for pos, name in enumerate(names_clean):
+            words = name.replace('-', ' ').split()
+            for start in range(len(words)):
+                entries.append((' '.join(words[start:]), pos, start))
+        entries.sort()
+        self.keys = [key for key, _, _ in entries]
+        self.positions = array('I', [pos for _, pos, _ in entries])
+        order = sorted(range(len(entries)),
+                       key=lambda i: (entries[i][2] > 0, len(names_clean[entries[i][1]]), entries[i][1]))
+        ranks = array('I', bytes(4 * len(entries)))
+        for rank, i in enumerate(order):
+            ranks[i] = rank
+        self.ranks = ranks
+        # Results for prefixes matching many keys ("i", "intel"), which cost a full scan of their range
+        self._wide = {}
+
+    @staticmethod
+    def normalize(text):
+        return ' '.join(clean_cpu_name(text).lower().replace('-', ' ').split())
+
+    def complete(self, prefix, limit=10):
+        """Positions of the best `limit` names with a word starting with prefix, best first"""
+        prefix = self.normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + '\uffff', lo)
+        wide = hi - lo > self.WIDE_RANGE
+        if wide and (prefix, limit) in self._wide:
+            return list(self._wide[prefix, limit])
+        # A name can match from more than one word, so take a few spares before dropping repeats
+        best = heapq.nsmallest(limit * 2, range(lo, hi), key=self.ranks.__getitem__)
+        result = []
+        seen = set()
+        for i in best:
+            pos = self.positions[i]
+            if pos not in seen:
+                seen.add(pos)
+                result.append(pos)
+                if len(result) == limit:
+                    break
+        if wide:
+            self._wide[prefix, limit] = tuple(result)
+        return result
+
+class CpuCatalog:
+    """
+    Read-only, in-memory copy of the cpus table.
+    Records are kept in id order, which is the order SQLite returns them for a table scan,
+    so the match helpers below yield rows in the same order the old LIKE queries did.
+    Substring matching goes through a CpuSearchIndex built once when the catalog loads.
+    """
+
+    def __init__(self, records, path=None, version=None, names_lower=None, names_clean=None, token_postings=None,
+                 index=None, model_positions=None):
+        self.path = path
+        # Content hash of the file the catalog was loaded from; changes whenever cpus.db does
+        self.version = version
+        self.records = records if isinstance(records, SnapshotRecords) else tuple(records)
+        if isinstance(self.records, SnapshotRecords):
+            names = self.records.names
+        else:
+            names = [record.name for record in self.records]
+        # Normalized names come precomputed from an optimized cpus.db (see build_catalog)
+        if names_lower is None:
+            names_lower = [name.lower() for name in names]
+        if names_clean is None:
+            names_clean = [clean_cpu_name(name).lower() for name in names]
+        self.names_clean = names_clean
+        self._positions = {}
+        self._clean_positions = {}
+        for pos, name in enumerate(names):
+            self._positions.setdefault(name, pos)
+            self._clean_positions.setdefault(names_clean[pos], pos)
+        # Prebuilt when loaded from a snapshot (see load_snapshot)
+        if model_positions is None:
+            model_positions = self._build_model_index(names_clean)
+        self._model_positions = model_positions
+        # LIKE is case-insensitive, so the index works on lowercased names
+        if index is None:
+            index = CpuSearchIndex(names_lower, names_clean, token_postings)
+        self.index = index
+        # Built on first use, only the web UI needs it
+        self._autocomplete = None
+
+    @staticmethod
+    def _build_model_index(names_clean):
+        """Canonical model key -> position of the first record with that model"""
+        models = {}
+        # Bypass the memo: every catalog name is parsed once, and would only evict query results
+        parse = parse_cpu_model.__wrapped__
+        for pos, name in enumerate(names_clean):
+            model = parse(name)
+            if model is not None:
+                models.setdefault(model.key, pos)
+        return models
+
+    def __len__(self):
+        return len(self.records)
+
+    def position(self, name):
+        """Position of the record with exactly this (case-sensitive) name, or None"""
+        return self._positions.get(name)
+
+    def position_clean(self, name):
+        """
+        Position of the first record whose cleaned name equals clean_cpu_name(name),
+        ignoring case, or None. e.g. "Intel Core i7-7600U" finds "Intel Core i7-7600U @ 2.80GHz"
+        """
+        return self._clean_positions.get(clean_cpu_name(name).lower())
+
+    def position_model(self, name):
+        """
+        Position of the record with the same model as name (see parse_cpu_model), or None.
+        e.g. "11th Gen Intel(R) Core(TM) i7-1165G7 @ 2.80GHz" finds "Intel Core i7-1165G7 @ 2.80GHz"
+        """
+        model = parse_cpu_model(name)
+        return None if model is None else self._model_positions.get(model.key)
+
+    def position_model_key(self, key):
+        """Position of the record whose CpuModel.key is key, or None"""
+        return self._model_positions.get(key)
+
+    def complete(self, prefix, limit=10):
+        """Positions of the names completing prefix, best first (see CpuAutocomplete)"""
+        if self._autocomplete is None:
+            self._autocomplete = CpuAutocomplete(self.names_clean)
+        return self._autocomplete.complete(prefix, limit)
+
+    def get(self, name):
+        """Exact (case-sensitive) name lookup, like WHERE name = ?"""
+        pos = self._positions.get(name)
+        return None if pos is None else self.records[pos]
+
+    def _records_at(self, positions):
+        records = self.records
+        return [records[pos] for pos in sorted(positions)]
+
+    def name_startswith(self, text):
+        """Records whose name starts with text (name LIKE 'text%')"""
+        return self._records_at(self.index.startswith(text))
+
+    def name_contains(self, text):
+        """Records whose name contains text (name LIKE '%text%')"""
+        return self._records_at(self.index.contains(text))
+
+    def name_contains_all(self, tokens):
+        """Records whose name contains every token"""
+        return self._records_at(self.index.contains_all(tokens))
+
+    def name_contains_any(self, tokens):
+        """Records whose name contains at least one token"""
+        return self._records_at(self.index.contains_any(tokens))
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def build_catalog(db_path):
+    """
+    Adds the search structures to cpus.db:
+        - unique index on name
+        - name_norm (lowercased name) and name_clean (clean_cpu_name, lowercased) columns
+        - cpus_fts, an FTS5 table over name_clean with prefix indexes
+    and stamps the file with CATALOG_SCHEMA_VERSION.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(cpus)")]
+        for column in ('name_norm', 'name_clean'):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE cpus ADD COLUMN {column} TEXT")
+        rows = conn.execute("SELECT id, name FROM cpus").fetchall()
+        conn.executemany(
+            "UPDATE cpus SET name_norm = ?, name_clean = ? WHERE id = ?",
+            [((name or '').lower(), clean_cpu_name(name).lower(), cpu_id) for cpu_id, name in rows]
+        )
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_cpus_name ON cpus(name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cpus_name_clean ON cpus(name_clean)")
+        conn.execute("DROP TABLE IF EXISTS cpus_fts")
+        conn.execute(
+            "CREATE VIRTUAL TABLE cpus_fts USING fts5("
+            "name_clean, content='cpus', content_rowid='id', prefix='2 3 4')"
+        )
+        conn.execute("INSERT INTO cpus_fts(cpus_fts) VALUES('rebuild')")
+        conn.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+def ensure_catalog(db_path='cpus.db'):
+    """
+    Rebuilds the search structures if db_path is older than CATALOG_SCHEMA_VERSION.
+    Returns True if the file was rebuilt.
+    """
+    db_path = resolve_db_path(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        version = get_schema_version(conn)
+    finally:
+        conn.close()
+    if version >= CATALOG_SCHEMA_VERSION:
+        return False
+    build_catalog(db_path)
+    return True
+
+def _load_token_postings(conn, positions_by_id):
+    """Reads the FTS5 vocabulary as token -> sorted positions"""
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.cpus_vocab USING fts5vocab(main, cpus_fts, 'instance')")
+    postings = {}
+    for term, cpu_id in conn.execute("SELECT DISTINCT term, doc FROM temp.cpus_vocab"):
+        postings.setdefault(term, []).append(positions_by_id[cpu_id])
+    for posting in postings.values():
+        posting.sort()
+    return postings
+
+def file_digest(path):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _file_stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+# SQLite settings for the read-only connections (see get_connection)
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+SQLITE_CACHED_STATEMENTS = 64
+
+def connect_readonly(db_path):
+    """
+    Opens db_path read-only and immutable: SQLite skips file locking and change detection,
+    and reads pages through a memory map.
+    """
+    uri = pathlib.Path(os.path.abspath(db_path)).as_uri() + '?mode=ro&immutable=1'
+    conn = sqlite3.connect(uri, uri=True, cached_statements=SQLITE_CACHED_STATEMENTS)
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    return conn
+
+# Per thread: db_path -> (read-only connection, (mtime_ns, size) of the file when it was opened)
+_connections = threading.local()
+
+def get_connection(db_path='cpus.db'):
+    """
+    Returns this thread's read-only connection to db_path, opening it on first use.
+    Each thread keeps its own connection (sqlite3 connections can't be shared between
+    threads), so Flask's worker threads never wait on each other or reconnect per request.
+    The connection is reopened if the file changes, since an immutable connection
+    would not notice.
+    """
+    db_path = resolve_db_path(db_path)
+    connections = getattr(_connections, 'by_path', None)
+    if connections is None:
+        connections = _connections.by_path = {}
+    stat = _file_stat(db_path)
+    entry = connections.get(db_path)
+    if entry is not None:
+        if entry[1] == stat:
+            return entry[0]
+        entry[0].close()
+    conn = connect_readonly(db_path)
+    connections[db_path] = (conn, stat)
+    return conn
+
+def load_catalog(db_path):
+    """
+    Loads the catalog for db_path.
+    Prefers the snapshot next to it (see write_snapshot): the frozen app uses it as is,
+    otherwise it is only used if it was made from the current db_path, so a stale snapshot
+    never hides an edited cpus.db. Falls back to reading cpus.db.
+    """
+    snapshot = snapshot_path(db_path)
+    if getattr(sys, 'frozen', False):
+        # The frozen app ships only the snapshot, there is no cpus.db to fall back to
+        try:
+            return read_snapshot(snapshot, db_path)
+        except SnapshotError as e:
+            raise RuntimeError(f"Could not load the CPU catalog snapshot {snapshot}: {e}")
+    if os.path.exists(snapshot):
+        source = file_digest(db_path) if os.path.exists(db_path) else None
+        catalog = load_snapshot(snapshot, db_path, source)
+        if catalog is not None:
+            return catalog
+    return load_catalog_sqlite(db_path)
+
+def load_catalog_sqlite(db_path):
+    """
+    Reads every row of the cpus table into a CpuCatalog.
+    Uses the precomputed columns and FTS5 vocabulary when the file has been through build_catalog().
+    """
+    version = file_digest(db_path) if os.path.exists(db_path) else None
+    conn = get_connection(db_path)
+    if get_schema_version(conn) >= CATALOG_SCHEMA_VERSION:
+        rows = conn.execute(
+            "SELECT id, year, url, name, cores, threads, clock, turbo, passmark, name_norm, name_clean "
+            "FROM cpus ORDER BY id"
+        ).fetchall()
+        records = [CpuRecord(*row[:9]) for row in rows]
+        positions_by_id = {record.id: pos for pos, record in enumerate(records)}
+        return CpuCatalog(
+            records, path=db_path, version=version,
+            names_lower=[row[9] for row in rows],
+            names_clean=[row[10] for row in rows],
+            token_postings=_load_token_postings(conn, positions_by_id)
+        )
+    rows = conn.execute(
+        "SELECT id, year, url, name, cores, threads, clock, turbo, passmark FROM cpus ORDER BY id"
+    ).fetchall()
+    return CpuCatalog((CpuRecord(*row) for row in rows), path=db_path, version=version)
+
+# Bump when the snapshot layout, or anything precomputed into it (tokenizer, model parser,
+# typo index), changes. Snapshots in another format are ignored.
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_MAGIC = b'CPUSNAP\0'
+
+def snapshot_path(db_path):
+    """Where the snapshot of db_path goes: cpus.db -> cpus.snapshot"""
+    return os.path.splitext(db_path)[0] + '.snapshot'
+
+def _pack_strings(strings):
+    """UTF-8 string table: every string followed by a NUL"""
+    strings = list(strings)
+    if any('\0' in text for text in strings):
+        raise ValueError("snapshot strings can't contain NUL")
+    return ''.join(text + '\0' for text in strings).encode('utf-8')
+
+def _unpack_strings(blob):
+    return str(blob, 'utf-8').split('\0')[:-1]
+
+def _pack_postings(mapping):
+    """Keys as a string table, and all posting lists in one array with len(mapping) + 1 offsets"""
+    postings = array('I')
+    offsets = array('I', [0])
+    for posting in mapping.values():
+        postings.extend(posting)
+        offsets.append(len(postings))
+    return _pack_strings(mapping), postings, offsets
+
+class PackedPostings(collections.abc.Mapping):
+    """
+    Read-only key -> posting list mapping over a snapshot's arrays.
+    Posting lists are sliced out of the mapped file when they are looked up.
+    """
+
+    def __init__(self, keys, postings, offsets):
+        self._slots = dict(zip(_unpack_strings(keys), range(len(offsets) - 1)))
+        self._postings = postings
+        self._offsets = offsets
+
+    def __getitem__(self, key):
+        i = self._slots[key]
+        return self._postings[self._offsets[i]:self._offsets[i + 1]]
+
+    def get(self, key, default=None):
+        i = self._slots.get(key)
+        if i is None:
+            return default
+        return self._postings[self._offsets[i]:self._offsets[i + 1]]
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __iter__(self):
+        return iter(self._slots)
+
+    def __len__(self):
+        return len(self._slots)
+
+def _snapshot_itemsizes():
+    return {typecode: array(typecode).itemsize for typecode in 'Iqd'}
+
+def write_snapshot(catalog, path):
+    """
+    Writes catalog to path as a snapshot that load_snapshot() can map straight into memory:
+    the numeric columns as fixed-width arrays, the names as a string table, and the search
+    index, model index and typo index as prebuilt key tables plus posting arrays.
+    Arrays are in the native byte order; the header records it, so a snapshot is only
+    used on the kind of machine it was built on.
+    """
+    records = catalog.records
+    index = catalog.index
+    sections = {}
+    for key in _SNAPSHOT_INT_COLUMNS:
+        sections[key] = array('q', (getattr(record, key) or 0 for record in records))
+    for key in _SNAPSHOT_FLOAT_COLUMNS:
+        sections[key] = array('d', (getattr(record, key) or 0.0 for record in records))
+    nulls = array('H')
+    for record in records:
+        bits = 0
+        for i, key in enumerate(CpuRecord.__slots__):
+            if getattr(record, key) is None:
+                bits |= 1 << i
+        nulls.append(bits)
+    sections['nulls'] = nulls
+    columns = {
+        'name': [record.name or '' for record in records],
+        'name_lower': index.names,
+        'name_clean': catalog.names_clean,
+    }
+    # URLs are only needed for the few records shown, so they get offsets for random access
+    urls = [(record.url or '').encode('utf-8') for record in records]
+    url_offsets = array('I', [0])
+    for url in urls:
+        url_offsets.append(url_offsets[-1] + len(url))
+    sections['url_strings'] = b''.join(urls)
+    sections['url_offsets'] = url_offsets
+    for key, strings in columns.items():
+        sections[key + '_strings'] = _pack_strings(strings)
+    for key, mapping in (('token', index.tokens), ('trigram', index.trigrams), ('delete', index.fuzzy.deletes)):
+        sections[key + '_keys'], sections[key + '_postings'], sections[key + '_offsets'] = _pack_postings(mapping)
+    sections['fuzzy_strings'] = _pack_strings(index.fuzzy.tokens)
+    sections['model_keys'] = _pack_strings(catalog._model_positions)
+    sections['model_positions'] = array('I', catalog._model_positions.values())
+
+    layout = {}
+    data = bytearray()
+    for name, section in sections.items():
+        raw = section.tobytes() if isinstance(section, array) else section
+        layout[name] = [len(data), len(raw), section.typecode if isinstance(section, array) else 'B']
+        data += raw
+        # Keep every array 8-byte aligned
+        data += b'\0' * (-len(data) % 8)
+    header = json.dumps({
+        'format': SNAPSHOT_FORMAT,
+        'schema': CATALOG_SCHEMA_VERSION,
+        'byteorder': sys.byteorder,
+        'itemsizes': _snapshot_itemsizes(),
+        'source': catalog.version,
+        'count': len(records),
+        'sections': layout,
+    }).encode('utf-8')
+    prefix = SNAPSHOT_MAGIC + struct.pack('<I', len(header)) + header
+    prefix += b'\0' * (-len(prefix) % 8)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class SnapshotError(ValueError):
+    """A file that isn't a usable snapshot; the message says why"""
+
+def load_snapshot(path, db_path=None, source=None):
+    """
+    Maps the snapshot at path into memory and returns a CpuCatalog over it, or None if the
+    file isn't a usable snapshot (other format or machine) or, when source is given,
+    wasn't made from a cpus.db with that file_digest().
+    The numeric columns and posting lists stay in the mapped file; only the names are decoded.
+    """
+    try:
+        return read_snapshot(path, db_path, source)
+    except SnapshotError:
+        return None
+
+def read_snapshot(path, db_path=None, source=None):
+    """load_snapshot, raising SnapshotError with the reason instead of returning None"""
+    try:
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"can't map the file: {e}")
+    view = memoryview(buffer)
+    if bytes(view[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+        raise SnapshotError("not a CPU catalog snapshot")
+    try:
+        start = len(SNAPSHOT_MAGIC) + 4
+        (header_size,) = struct.unpack_from('<I', view, len(SNAPSHOT_MAGIC))
+        header = json.loads(bytes(view[start:start + header_size]).decode('utf-8'))
+    except (struct.error, ValueError) as e:
+        raise SnapshotError(f"corrupt header: {e}")
+    for key, expected in (('format', SNAPSHOT_FORMAT), ('schema', CATALOG_SCHEMA_VERSION),
+                          ('byteorder', sys.byteorder), ('itemsizes', _snapshot_itemsizes())):
+        if header.get(key) != expected:
+            raise SnapshotError(f"{key} is {header.get(key)!r}, this build needs {expected!r}")
+    if source is not None and header.get('source') != source:
+        raise SnapshotError("made from a different cpus.db")
+
+    data_start = start + header_size
+    data_start += -data_start % 8
+    def section(name):
+        offset, size, typecode = header['sections'][name]
+        part = view[data_start + offset:data_start + offset + size]
+        return part if typecode == 'B' else part.cast(typecode)
+
+    def strings(key):
+        return _unpack_strings(section(key + '_strings'))
+
+    def postings(key):
+        return PackedPostings(section(key + '_keys'), section(key + '_postings'), section(key + '_offsets'))
+
+    url_strings, url_offsets = section('url_strings'), section('url_offsets')
+    def url(pos):
+        return bytes(url_strings[url_offsets[pos]:url_offsets[pos + 1]]).decode('utf-8')
+
+    columns = {key: section(key) for key in _SNAPSHOT_INT_COLUMNS + _SNAPSHOT_FLOAT_COLUMNS}
+    records = SnapshotRecords(columns, section('nulls'), strings('name'), url)
+    names_lower = strings('name_lower')
+    fuzzy = FuzzyTokenIndex(strings('fuzzy'), postings('delete'))
+    index = CpuSearchIndex.from_snapshot(names_lower, postings('token'), postings('trigram'), fuzzy)
+    model_keys = _unpack_strings(section('model_keys'))
+    return CpuCatalog(
+        records, path=db_path or path, version=header.get('source'),
+        names_lower=names_lower, names_clean=strings('name_clean'),
+        index=index, model_positions=dict(zip(model_keys, section('model_positions')))
+    )
+
+# db_path -> (catalog, (mtime_ns, size) of the file when it was last checked)
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(db_path='cpus.db'):
+    """
+    Returns the process-wide catalog for db_path, loading it on first use.
+    The catalog is reloaded if the file's contents change (e.g. after 'python catalog.py rebuild').
+    """
+    db_path = resolve_db_path(db_path)
+    stat = _file_stat(db_path)
+    entry = _catalogs.get(db_path)
+    if entry is not None and entry[1] == stat:
+        return entry[0]
+    with _catalogs_lock:
+        entry = _catalogs.get(db_path)
+        if entry is not None and entry[1] == stat:
+            return entry[0]
+        if entry is not None and stat is not None and entry[0].version == file_digest(db_path):
+            # Touched but not modified: keep the loaded catalog
+            catalog = entry[0]
+        else:
+            catalog = load_catalog(db_path)
+        _catalogs[db_path] = (catalog, stat)
+    return catalog
+
+def build_snapshot(db_path='cpus.db'):
+    """
+    Brings db_path up to the current schema and writes its snapshot next to it.
+    Returns the snapshot path.
+    """
+    db_path = resolve_db_path(db_path)
+    ensure_catalog(db_path)
+    path = snapshot_path(db_path)
+    write_snapshot(load_catalog_sqlite(db_path), path)
+    return path
+
+if __name__ == "__main__":
+    # python catalog.py rebuild [path]   -> always rebuild
+    # python catalog.py [check] [path]   -> rebuild only if the schema version is out of date
+    # python catalog.py snapshot [path]  -> check, then write the snapshot the frozen app loads
+    args = sys.argv[1:]
+    command = args.pop(0) if args and args[0] in ('rebuild', 'check', 'snapshot') else 'check'
+    path = resolve_db_path(args[0] if args else 'cpus.db')
+    if command == 'rebuild':
+        build_catalog(path)
+        print(f"Rebuilt {path} (schema version {CATALOG_SCHEMA_VERSION})")
+    elif command == 'snapshot':
+        snapshot = build_snapshot(path)
+        print(f"Wrote {snapshot} ({os.path.getsize(snapshot) // 1024} KB)")
+    elif ensure_catalog(path):
+        print(f"Updated {path} to schema version {CATALOG_SCHEMA_VERSION}")
+    else:
+        print(f"{path} is up to date (schema version {CATALOG_SCHEMA_VERSION})")
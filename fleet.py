@@ -0,0 +1,232 @@
+"""
+Server side of fleet scanning: batch ingest of agent reports (see agent.py).
+
+Reports posted by many machines at once are collected into micro-batches. Each batch
+resolves its CPUs once per distinct name, is priced with pricing.calculate_prices_batch,
+and the priced machines are queued for build sheet rendering on a background thread.
+"""
+import collections
+import concurrent.futures
+import datetime
+import itertools
+import math
+import os
+import queue
+import re
+import threading
+import time
+
+import pricing
+import report
+
+# Where queued build sheets are written
+FLEET_OUTPUT_DIR = 'fleet_sheets'
+# Oldest finished jobs are forgotten past this many
+MAX_JOBS = 5000
+
+# Upper bound for any size or price in a report; anything larger is a broken agent
+MAX_SPEC_VALUE = 1e7
+
+def _spec_number(value, name):
+    """value as a float, which must be finite and between 0 and MAX_SPEC_VALUE"""
+    number = float(value or 0)
+    # float() accepts "nan" and "inf", which only fail later, in the middle of a batch
+    if not math.isfinite(number) or not 0 <= number <= MAX_SPEC_VALUE:
+        raise ValueError(f"{name} out of range: {value!r}")
+    return number
+
+def specs_from_report(agent_report):
+    """
+    Validates an agent report and returns the specs dict calculate_price expects.
+    Raises ValueError for anything that isn't a well-formed report.
+    """
+    if not isinstance(agent_report, dict) or not isinstance(agent_report.get('specs'), dict):
+        raise ValueError("report must be an object with a 'specs' object")
+    specs = dict(agent_report['specs'])
+    try:
+        specs['cpu_name'] = str(specs.get('cpu_name') or '')
+        specs['ram_gb'] = _spec_number(specs.get('ram_gb'), 'ram_gb')
+        specs['ram_type'] = str(specs.get('ram_type') or '')
+        specs['os_name'] = str(specs.get('os_name') or '')
+        specs['is_laptop'] = bool(specs.get('is_laptop'))
+        specs['gpu_price'] = _spec_number(specs.get('gpu_price'), 'gpu_price')
+        if specs.get('manual_passmark') is not None:
+            specs['manual_passmark'] = _spec_number(specs['manual_passmark'], 'manual_passmark')
+        specs['drives'] = [{'capacity_gb': _spec_number(d['capacity_gb'], 'capacity_gb'),
+                            'type': str(d.get('type') or ''),
+                            'device': str(d.get('device') or ''), 'model': str(d.get('model') or '')}
+                           for d in specs.get('drives') or []]
+    except (TypeError, KeyError, ValueError) as e:
+        raise ValueError(f"bad specs: {e}")
+    return specs
+
+def _sheet_filename(job):
+    # Serial or host name, reduced to characters that are safe in a file name on every OS
+    label = re.sub(r'[^A-Za-z0-9_.-]+', '_', job['serial_number'] or job['host'] or 'machine').strip('_.')
+    return f"BuildSheet_{job['id']:05d}_{label or 'machine'}.pdf"
+
+class FleetIngest:
+    """
+    Batch ingest of agent reports, and the queue of build sheets to render.
+    submit() may be called from any number of request threads at once.
+    """
+
+    def __init__(self, db_path='cpus.db', output_dir=FLEET_OUTPUT_DIR, batch_size=64, batch_wait=0.05,
+                 render_sheets=True):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        # How long a batch waits for more reports after its first one
+        self.batch_wait = batch_wait
+        self.render_sheets = render_sheets
+        self.jobs = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._incoming = queue.Queue()
+        self._sheets = queue.Queue()
+        threading.Thread(target=self._batch_loop, name='fleet-batch', daemon=True).start()
+        if render_sheets:
+            threading.Thread(target=self._sheet_loop, name='fleet-sheets', daemon=True).start()
+
+    def submit(self, agent_reports):
+        """
+        Queues reports for pricing. Returns one Future per report, resolving to its job summary.
+        Raises ValueError (before anything is queued) if any report is malformed, naming the report.
+        """
+        items = []
+        for n, agent_report in enumerate(agent_reports):
+            try:
+                items.append((agent_report, specs_from_report(agent_report)))
+            except ValueError as e:
+                raise ValueError(f"report {n}: {e}")
+        futures = []
+        for agent_report, specs in items:
+            future = concurrent.futures.Future()
+            self._incoming.put((agent_report, specs, future))
+            futures.append(future)
+        return futures
+
+    def ingest(self, agent_reports, timeout=30):
+        """submit() and wait: list of job summaries, in report order"""
+        return [future.result(timeout) for future in self.submit(agent_reports)]
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._incoming.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._incoming.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._price_batch(batch)
+
+    def _price_batch(self, batch):
+        try:
+            specs_list = [specs for _, specs, _ in batch]
+            # One catalog search per distinct CPU name; a cart of identical machines is a single lookup
+            models = {}
+            for specs in specs_list:
+                name = specs['cpu_name']
+                if name not in models:
+                    candidates = pricing.get_cpu_candidates(name, db_path=self.db_path, limit=1)
+                    models[name] = candidates[0]['name'] if candidates else None
+                if models[name] and not specs.get('cpu_model_name'):
+                    specs['cpu_model_name'] = models[name]
+            try:
+                results = pricing.calculate_prices_batch(specs_list, db_path=self.db_path)
+            except Exception:
+                # One bad report mustn't fail the whole batch: price them one at a time
+                results = [self._price_one(specs) for specs in specs_list]
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        received_at = datetime.datetime.now().isoformat(timespec='seconds')
+        for (agent_report, specs, future), price_data in zip(batch, results):
+            if isinstance(price_data, Exception):
+                future.set_exception(price_data)
+                continue
+            job = {
+                'id': next(self._ids),
+                'received_at': received_at,
+                'host': str(agent_report.get('host') or ''),
+                'serial_number': str(agent_report['specs'].get('serial_number') or ''),
+                'computer_model': str(agent_report.get('model') or ''),
+                'specs': specs,
+                'pricing': price_data,
+                'status': 'queued' if self.render_sheets else 'priced',
+                'pdf_path': None,
+                'error': None,
+            }
+            with self._lock:
+                self.jobs[job['id']] = job
+                while len(self.jobs) > MAX_JOBS:
+                    self.jobs.popitem(last=False)
+            if self.render_sheets:
+                self._sheets.put(job)
+            future.set_result(self.summary(job))
+
+    def _price_one(self, specs):
+        """Price data for one specs dict, or the exception pricing it raised"""
+        try:
+            return pricing.calculate_prices_batch([specs], db_path=self.db_path)[0]
+        except Exception as e:
+            return e
+
+    def _sheet_loop(self):
+        while True:
+            job = self._sheets.get()
+            job['status'] = 'rendering'
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                path = os.path.join(self.output_dir, _sheet_filename(job))
+                custom_fields = {
+                    'computer_model': job['computer_model'],
+                    'serial_number': job['serial_number'],
+                    'gpu_name': job['specs'].get('gpu_name', ''),
+                }
+                report.generate_pdf(job['specs'], job['pricing'], custom_fields, filename=path)
+                job['pdf_path'] = os.path.abspath(path)
+                job['status'] = 'done'
+            except Exception as e:
+                print(f"Build sheet for fleet job {job['id']} failed: {e}")
+                job['error'] = str(e)
+                job['status'] = 'error'
+
+    @staticmethod
+    def summary(job):
+        return {
+            'id': job['id'],
+            'host': job['host'],
+            'serial_number': job['serial_number'],
+            'cpu_model': job['specs'].get('cpu_model_name'),
+            'final_price': job['pricing']['final_price'],
+            'status': job['status'],
+            'pdf_path': job['pdf_path'],
+            'error': job['error'],
+        }
+
+    def get_job(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self, status=None):
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return [self.summary(job) for job in jobs if status is None or job['status'] == status]
+
+# Created on first use, so Flask's reloader parent process never starts the worker threads
+_fleet = None
+_fleet_lock = threading.Lock()
+
+def get_fleet():
+    global _fleet
+    with _fleet_lock:
+        if _fleet is None:
+            _fleet = FleetIngest(output_dir=os.environ.get('FLEET_OUTPUT_DIR', FLEET_OUTPUT_DIR))
+        return _fleet
@@ -1,20 +1,23 @@
-import sqlite3
-import math
-import re
-import difflib
+from array import array
+import functools
+import heapq
 import os
+import sys
+import threading
+import types
 
-def get_resource_path(filename):
-    """
-    Get absolute path to resource, works for dev and frozen app
-    """
-    import sys
-    if getattr(sys, 'frozen', False):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return os.path.join(base_path, 'resources', filename)
+from catalog import clean_cpu_name, get_catalog, parse_cpu_model
+# Re-exported on purpose: debug_pricing.py imports get_resource_path from here
+from catalog import get_resource_path  # noqa: F401
+
+# Try to import numpy for batch pricing
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Set this environment variable (e.g. PRICING_DEBUG=1) to dump each prices.txt load to pricing_debug.txt
+PRICING_DEBUG_ENV = 'PRICING_DEBUG'
 
 def load_prices_config(config_path='prices.txt'):
     """
@@ -65,7 +68,19 @@ def load_prices_config(config_path='prices.txt'):
         except Exception as e:
             print(f"Error loading prices.txt from {config_path}: {e}")
                 
-    # Debug logging
+    # Debug logging (opt-in, see PRICING_DEBUG_ENV)
+    if os.environ.get(PRICING_DEBUG_ENV):
+        write_pricing_debug(config_path, config, loaded)
+
+    if not loaded:
+        print(f"Warning: {config_path} not found. Using internal defaults.")
+            
+    return config
+
+def write_pricing_debug(config_path, config, loaded):
+    """
+    Writes what load_prices_config() saw to pricing_debug.txt (next to the exe when frozen).
+    """
     try:
         log_path = "pricing_debug.txt"
         if getattr(sys, 'frozen', False):
@@ -82,70 +97,114 @@ def load_prices_config(config_path='prices.txt'):
     except Exception as e:
         pass
 
-    if not loaded:
-        print(f"Warning: {config_path} not found. Using internal defaults.")
-            
-    return config
+# abspath -> (read-only config, (mtime_ns, size) of prices.txt when loaded, or None if missing)
+_prices_snapshots = {}
+_prices_lock = threading.Lock()
 
-def clean_cpu_name(name):
+def _config_stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def get_prices_config(config_path='prices.txt'):
     """
-    Cleans CPU name to improve matching success
-    e.g. "Intel(R) Core(TM) i7-7600U CPU @ 2.80GHz" -> "Intel Core i7-7600U"
+    Returns the pricing configuration as a read-only mapping.
+    prices.txt is parsed once and only re-read when its mtime or size changes,
+    so editing the file still takes effect on the next price calculation.
     """
-    if not name: return ""
-    # Remove (R), (TM), CPU, Processor
-    name = re.sub(r'\(R\)', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\(TM\)', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+CPU\s*', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+Processor\s*', '', name, flags=re.IGNORECASE)
-    # Remove core/thread counts (e.g. 12-Core, 16-Thread)
-    name = re.sub(r'\s+\d+-Core', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+\d+-Thread', '', name, flags=re.IGNORECASE)
-    # Remove clock speed info if present (e.g. @ 2.80GHz)
-    name = name.split('@')[0]
-    # Remove extra spaces
-    return " ".join(name.split())
+    key = os.path.abspath(config_path)
+    stat = _config_stat(key)
+    snapshot = _prices_snapshots.get(key)
+    if snapshot is not None and snapshot[1] == stat:
+        return snapshot[0]
+    with _prices_lock:
+        snapshot = _prices_snapshots.get(key)
+        if snapshot is None or snapshot[1] != stat:
+            snapshot = (types.MappingProxyType(load_prices_config(config_path)), stat)
+            _prices_snapshots[key] = snapshot
+    return snapshot[0]
+
+# Catalog version the candidate cache was filled from
+_candidates_version = None
 
 def get_cpu_candidates(query, db_path='cpus.db', limit=20):
     """
     Finds potential CPU matches in the database.
     Returns list of dicts: {'name', 'year', 'cores', 'threads', 'clock', 'turbo', 'passmark', 'score'}
+    Results are ordered by score, then by how closely the name fits the query.
     """
+    global _candidates_version
+    catalog = get_catalog(db_path)
+    if catalog.version != _candidates_version:
+        _rank_candidates.cache_clear()
+        _candidates_version = catalog.version
     
-    # Resolve db path
-    if not os.path.isabs(db_path):
-        res_path = get_resource_path(db_path)
-        if os.path.exists(res_path):
-            db_path = res_path
-            
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    clean_query = clean_cpu_name(query)
+    # Parsed from the raw query: cleaning glues "Xeon(R) CPU E5" into "XeonE5"
+    model = parse_cpu_model(query)
     candidates = []
+    for score_type, pos in _rank_candidates(catalog, clean_cpu_name(query), limit, model and model.key):
+        d = catalog.records[pos].to_dict()
+        d['score'] = score_type
+        candidates.append(d)
+    return candidates
+
+def autocomplete_cpu(prefix, db_path='cpus.db', limit=10):
+    """
+    Catalog CPUs completing a partially typed name or model number, best first.
+    Returns the same dicts as get_cpu_candidates, without 'score'.
+    """
+    catalog = get_catalog(db_path)
+    return [catalog.records[pos].to_dict() for pos in catalog.complete(prefix, limit)]
+
+@functools.lru_cache(maxsize=256)
+def _rank_candidates(catalog, clean_query, limit, model_key=None):
+    """
+    Ranked (score, catalog position) pairs for a cleaned query and its CpuModel key.
+    Cached, since the same few CPU models come up over and over in a session.
+    """
+    index = catalog.index
     
-    # helper to add uniques
-    seen_names = set()
-    def add_candidates(rows, score_type):
-        for row in rows:
-            if row['name'] not in seen_names:
-                d = dict(row)
-                d['score'] = score_type
-                candidates.append(d)
-                seen_names.add(row['name'])
+    # Only the best `limit` hits are kept. Tiers run best-first, so a lower tier
+    # can only fill the slots a higher tier left open.
+    picked = []
+    seen = set()
+    def add_candidates(positions, score_type, max_rows=None, distances=None):
+        new = positions - seen
+        seen.update(new)
+        room = limit - len(picked)
+        if max_rows is not None:
+            room = min(room, max_rows)
+        if room > 0 and new:
+            # Within a tier, catalog order (as the full scan returned them), so keeping
+            # only the best `limit` never changes which CPU comes out on top.
+            # Typo matches go closest first.
+            if distances:
+                key = lambda pos: (distances[pos], pos)
+            else:
+                key = None
+            picked.extend((score_type, pos) for pos in heapq.nsmallest(room, new, key=key))
 
-    # 1. Exact Match on Cleaned Name
-    cursor.execute("SELECT * FROM cpus WHERE name = ?", (clean_query,))
-    add_candidates(cursor.fetchall(), 100)
+    # 1. Exact Match on Cleaned Name (against the catalog name or its precomputed cleaned form,
+    # so "Intel Core i7-7600U" finds "Intel Core i7-7600U @ 2.80GHz")
+    exact = catalog.position(clean_query)
+    if exact is None and clean_query:
+        exact = catalog.position_clean(clean_query)
+    add_candidates(set() if exact is None else {exact}, 100)
+
+    # 1b. Same model number (one dict lookup), e.g. "11th Gen Intel Core i7-1165G7" or "i7-7600U"
+    if len(picked) < limit:
+        model = None if model_key is None else catalog.position_model_key(model_key)
+        add_candidates(set() if model is None else {model}, 95)
     
     # 2. LIKE Match (Start with)
-    cursor.execute("SELECT * FROM cpus WHERE name LIKE ?", (f"{clean_query}%",))
-    add_candidates(cursor.fetchall(), 90)
+    if len(picked) < limit:
+        add_candidates(index.startswith(clean_query), 90)
     
     # 3. LIKE Match (Contains)
-    cursor.execute("SELECT * FROM cpus WHERE name LIKE ?", (f"%{clean_query}%",))
-    add_candidates(cursor.fetchall(), 80)
+    if len(picked) < limit:
+        add_candidates(index.contains(clean_query), 80)
     
     # 4. Token Match (More vague)
     # Split query into tokens, filter out common words like "Intel", "AMD", "Core" if we want, 
@@ -153,85 +212,122 @@ def get_cpu_candidates(query, db_path='cpus.db', limit=20):
     tokens = clean_query.split()
     significant_tokens = [t for t in tokens if len(t) > 2 and t.lower() not in ['intel', 'amd', 'core', 'ryzen', 'cpu']]
     
-    if len(candidates) < limit and significant_tokens:
-        # Try to match ANY of the significant tokens (OR logic) for broad search
-        # Or AND logic for specific search. Let's try AND logic first with relaxed constraints.
-        
-        # Strategy: Match rows that contain ALL significant tokens
-        if len(significant_tokens) > 0:
-            query_parts = ["name LIKE ?" for _ in significant_tokens]
-            sql = f"SELECT * FROM cpus WHERE {' AND '.join(query_parts)} LIMIT 50"
-            params = [f"%{t}%" for t in significant_tokens]
-            cursor.execute(sql, params)
-            add_candidates(cursor.fetchall(), 60)
+    if len(seen) < limit and significant_tokens:
+        # Strategy: Match rows that contain ALL significant tokens (at most 50 rows)
+        add_candidates(index.contains_all(significant_tokens), 60, max_rows=50)
             
-    # 5. Even more vague: Match ANY significant token (if still few results)
-    if len(candidates) < 5 and significant_tokens:
-         query_parts = ["name LIKE ?" for _ in significant_tokens]
-         sql = f"SELECT * FROM cpus WHERE {' OR '.join(query_parts)} LIMIT 50"
-         params = [f"%{t}%" for t in significant_tokens]
-         cursor.execute(sql, params)
-         add_candidates(cursor.fetchall(), 40)
+    # 4b. Typo-tolerant: every word matches a catalog token within an edit or two
+    # (e.g. "Rayzen 5 3600" or "Xoen"), closest names first. Not needed once the exact
+    # name or model number was found; those typo hits would only be other SKUs.
+    if len(picked) < limit and not (picked and picked[0][0] >= 95):
+        distances = index.similar(clean_query)
+        add_candidates(set(distances), 50, max_rows=50, distances=distances)
 
-    conn.close()
+    # 5. Even more vague: Match ANY significant token (if still few results)
+    if len(seen) < 5 and len(picked) < limit and significant_tokens:
+         add_candidates(index.contains_any(significant_tokens), 40, max_rows=50)
     
-    return candidates[:limit]
+    return tuple(picked)
 
-def calculate_price(specs, db_path='cpus.db', manual_passmark=None):
+# Integer codes for the spec strings that pick a multiplier.
+# Shared by calculate_price and calculate_prices_batch so both classify specs the same way.
+RAM_DEFAULT, RAM_DDR3, RAM_DDR4, RAM_DDR5 = 0, 1, 2, 3
+DRIVE_DEFAULT, DRIVE_HDD, DRIVE_SSD, DRIVE_NVME = 0, 1, 2, 3
+OS_DEFAULT, OS_LINUX, OS_MACOS, OS_WINDOWS = 0, 1, 2, 3
+
+LINUX_OS_NAMES = ('linux', 'ubuntu', 'fedora', 'debian', 'pop', 'mint')
+
+def ram_type_code(ram_type):
+    rtype = ram_type.lower()
+    if 'ddr3' in rtype: return RAM_DDR3
+    elif 'ddr4' in rtype: return RAM_DDR4
+    elif 'ddr5' in rtype: return RAM_DDR5
+    return RAM_DEFAULT
+
+def drive_type_code(drive_type):
+    dtype = drive_type.lower()
+    if 'hdd' in dtype: return DRIVE_HDD
+    elif 'nvme' in dtype: return DRIVE_NVME
+    elif 'ssd' in dtype: return DRIVE_SSD
+    return DRIVE_DEFAULT
+
+def os_code(os_name):
+    os_name = os_name.lower()
+    if any(name in os_name for name in LINUX_OS_NAMES):
+        return OS_LINUX
+    elif 'mac' in os_name or 'macos' in os_name:
+        return OS_MACOS
+    elif 'windows' in os_name or 'microsoft' in os_name:
+        return OS_WINDOWS
+    return OS_DEFAULT
+
+def _ram_multipliers(prices):
+    """RAM price per GB, indexed by RAM type code"""
+    return (prices.get('RAM_DEFAULT_MULT', 2.5), prices.get('RAM_DDR3_MULT', 1.5),
+            prices.get('RAM_DDR4_MULT', 2.5), prices.get('RAM_DDR5_MULT', 6.0))
+
+def _drive_multipliers(prices):
+    """Drive price per GB, indexed by drive type code"""
+    return (prices.get('DRIVE_DEFAULT_PER_GB', 0.08), prices.get('DRIVE_HDD_PER_GB', 0.02),
+            prices.get('DRIVE_SSD_PER_GB', 0.08), prices.get('DRIVE_NVME_PER_GB', 0.1))
+
+def _os_multipliers(prices):
+    """OS multiplier, indexed by OS code (unknown OSes are priced like Windows)"""
+    return (prices.get('OS_WINDOWS_MULT', 1.0), prices.get('OS_LINUX_MULT', 0.85),
+            prices.get('OS_MACOS_MULT', 1.2), prices.get('OS_WINDOWS_MULT', 1.0))
+
+def _unwrap_cpu(db_cpu):
+    """Pricing fields of a catalog row, with defaults for missing values: (year, cores, threads, clock, turbo, passmark)"""
+    year = int(db_cpu['year']) if db_cpu['year'] else 2015
+    cores = int(db_cpu['cores']) if db_cpu['cores'] else 2
+    threads = int(db_cpu['threads']) if db_cpu['threads'] else 2
+    clock = float(db_cpu['clock']) if db_cpu['clock'] else 2000
+    turbo = float(db_cpu['turbo']) if db_cpu['turbo'] and db_cpu['turbo'] != -1 else clock
+    passmark = float(db_cpu['passmark']) if db_cpu['passmark'] else 1000
+    return year, cores, threads, clock, turbo, passmark
+
+class ResolvedCpu:
     """
-    Calculates the detailed price breakdown of the computer.
-    
-    specs: dict containing:
-        - cpu_name: str (Raw string from scanner)
-        - cpu_model_name: str (Optional: Specific DB name selected by user/logic)
-        - ram_gb: float
-        - ram_type: str ('DDR3', 'DDR4', 'DDR5')
-        - drives: list of dicts [{'type': 'HDD'/'SSD'/'NVMe', 'capacity_gb': float}]
-        - gpu_price: float (manual input)
-        - os_name: str ('Windows', 'Linux', 'macOS')
-        - is_laptop: bool
-    
-    manual_passmark: float (Optional override for passmark score)
-    
-    returns: dict with detailed price breakdown and total
+    The CPU a spec dict is priced with.
+    position is the catalog position (None if not found); turbo is as stored (MHz or GHz).
     """
-    
-    # Resolve db path
-    if not os.path.isabs(db_path):
-        res_path = get_resource_path(db_path)
-        if os.path.exists(res_path):
-            db_path = res_path
-    
-    # Load Pricing Config
-    prices = load_prices_config()
-    
-    # 1. Determine CPU details
-    db_cpu = None
+    __slots__ = ('name', 'position', 'year', 'cores', 'threads', 'clock', 'turbo', 'passmark', 'passmark_override')
+
+    def __init__(self, name, position, year, cores, threads, clock, turbo, passmark, passmark_override):
+        self.name = name
+        self.position = position
+        self.year = year
+        self.cores = cores
+        self.threads = threads
+        self.clock = clock
+        self.turbo = turbo
+        self.passmark = passmark
+        self.passmark_override = passmark_override
+
+def _resolve_cpu(specs, db_path, manual_passmark, catalog=None):
+    """
+    Looks up the CPU for a spec dict and applies the manual passmark override.
+    Returns a ResolvedCpu.
+    """
+    if catalog is None:
+        catalog = get_catalog(db_path)
+    position = None
     
     # If a specific model name is provided (manual selection), try to load that exact one first
     if specs.get('cpu_model_name'):
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM cpus WHERE name = ?", (specs['cpu_model_name'],))
-        db_cpu = c.fetchone()
-        conn.close()
+        position = catalog.position(specs['cpu_model_name'])
     
     # If no specific model or not found, try search
-    if not db_cpu:
-        candidates = get_cpu_candidates(specs.get('cpu_name', ''), db_path)
+    if position is None:
+        candidates = get_cpu_candidates(specs.get('cpu_name', ''), db_path, limit=1)
         if candidates:
-            db_cpu = candidates[0] # Best match
+            position = catalog.position(candidates[0]['name']) # Best match
     
     # Unwrap CPU details
-    if db_cpu:
-        db_name = db_cpu['name']
-        year = int(db_cpu['year']) if db_cpu['year'] else 2015
-        cores = int(db_cpu['cores']) if db_cpu['cores'] else 2
-        threads = int(db_cpu['threads']) if db_cpu['threads'] else 2
-        clock = float(db_cpu['clock']) if db_cpu['clock'] else 2000
-        turbo = float(db_cpu['turbo']) if db_cpu['turbo'] and db_cpu['turbo'] != -1 else clock
-        passmark = float(db_cpu['passmark']) if db_cpu['passmark'] else 1000
+    if position is not None:
+        db_cpu = catalog.records[position]
+        db_name = db_cpu.name
+        year, cores, threads, clock, turbo, passmark = _unwrap_cpu(db_cpu)
     else:
         # Fallback / Not Found
         clean_name = clean_cpu_name(specs.get('cpu_name', 'Unknown'))
@@ -246,16 +342,31 @@ def calculate_price(specs, db_path='cpus.db', manual_passmark=None):
         # Here we just calculate price. Manual passmark is separate.
         
     # Apply Manual Passmark if provided
+    passmark_override = False
     if manual_passmark is not None:
         try:
             passmark = float(manual_passmark)
+            passmark_override = True
         except (ValueError, TypeError):
             pass
 
+    return ResolvedCpu(db_name, position, year, cores, threads, clock, turbo, passmark, passmark_override)
+
+def _passmark_scaled(base_cpu_calc, passmark, laptop):
+    # double cpuPrice = (laptop) ?
+    #         (((corePrice + threadPrice) * turbo) + yearPrice) * (passmark/5813) :
+    #         (((corePrice + threadPrice) * turbo) + yearPrice) * ((passmark/9530) * 0.67);
+    if laptop:
+        return base_cpu_calc * (passmark / 5813.0)
+    return base_cpu_calc * ((passmark / 9530.0) * 0.67)
+
+def _cpu_component_prices(year, cores, threads, turbo, passmark, laptop, prices):
+    """
+    CPU part of the price.
+    Returns (turbo in GHz, base_cpu_calc, cpu_price); base_cpu_calc also feeds the OS modifier.
+    """
     # Pricing Logic (Using Config)
     # double yearPrice = (build.cpu.year - 2012) * ((laptop) ? 6 : 10);
-    laptop = specs.get('is_laptop', False)
-    
     year_base = prices.get('CPU_YEAR_BASE', 2012)
     year_mult = prices.get('CPU_YEAR_LAPTOP_MULT', 6) if laptop else prices.get('CPU_YEAR_DESKTOP_MULT', 10)
     year_price = (year - year_base) * year_mult
@@ -271,62 +382,91 @@ def calculate_price(specs, db_path='cpus.db', manual_passmark=None):
     # Turbo MUST be in GHz (e.g. 3.5).
     if turbo > 100: turbo = turbo / 1000.0
     
-    # RAM Price
-    ram_multiplier = prices.get('RAM_DEFAULT_MULT', 2.5)
-    rtype = specs.get('ram_type', '').lower()
-    if 'ddr3' in rtype: ram_multiplier = prices.get('RAM_DDR3_MULT', 1.5)
-    elif 'ddr4' in rtype: ram_multiplier = prices.get('RAM_DDR4_MULT', 2.5)
-    elif 'ddr5' in rtype: ram_multiplier = prices.get('RAM_DDR5_MULT', 6.0)
-    
-    ram_price = specs['ram_gb'] * ram_multiplier
+    base_cpu_calc = ((core_price + thread_price) * turbo) + year_price
+    return turbo, base_cpu_calc, _passmark_scaled(base_cpu_calc, passmark, laptop)
 
-    # Drive Price
-    drive_price = 0
-    for drive in specs['drives']:
-        cap = drive['capacity_gb']
-        dtype = drive['type'].lower()
-        d_mult = prices.get('DRIVE_DEFAULT_PER_GB', 0.08)
-        if 'hdd' in dtype: d_mult = prices.get('DRIVE_HDD_PER_GB', 0.02)
-        elif 'nvme' in dtype: d_mult = prices.get('DRIVE_NVME_PER_GB', 0.1)
-        elif 'ssd' in dtype: d_mult = prices.get('DRIVE_SSD_PER_GB', 0.08)
-        drive_price += cap * d_mult
+def _cpu_config(prices):
+    """The CPU_* part of the pricing config, the only keys the CPU price table depends on"""
+    return tuple(sorted((key, value) for key, value in prices.items() if key.startswith('CPU_')))
 
-    gpu_price = specs.get('gpu_price', 0.0)
+class CpuPriceTable:
+    """
+    CPU component prices per catalog row, in laptop and desktop variants.
+    Index 1 of each pair is the laptop variant, index 0 the desktop one.
+    Built from the catalog's own passmark; a manual passmark only rescales base_cpu_calc.
+    A row is priced the first time it is looked up, so building the table doesn't
+    read every (lazily loaded) catalog record.
+    """
 
-    # OS Modifier and Temp Calc
-    temp = (((core_price + thread_price) * turbo) + year_price) + ram_price + drive_price + gpu_price
-    
-    os_modifier = 0
-    os_name = specs['os_name'].lower()
-    
-    os_mult = prices.get('OS_WINDOWS_MULT', 1.0) # Default
-    if 'linux' in os_name or 'ubuntu' in os_name or 'fedora' in os_name or 'debian' in os_name or 'pop' in os_name or 'mint' in os_name:
-        os_mult = prices.get('OS_LINUX_MULT', 0.85)
-    elif 'mac' in os_name or 'macos' in os_name:
-        os_mult = prices.get('OS_MACOS_MULT', 1.2)
-    elif 'windows' in os_name or 'microsoft' in os_name:
-        os_mult = prices.get('OS_WINDOWS_MULT', 1.0)
-        
-    # Logic: modifier is the difference from temp
-    # If os_mult is 0.85 (15% off), price is temp * 0.85. 
-    # The "modifier" value added to breakdown is (temp * 0.85) - temp = negative number
-    os_modifier = (os_mult * temp) - temp
+    def __init__(self, catalog, prices):
+        self.catalog = catalog
+        self.prices = prices
+        self.cpu_config = _cpu_config(prices)
+        size = len(catalog.records)
+        self.turbo = array('d', [0.0]) * size
+        self.base_cpu_calc = (array('d', [0.0]) * size, array('d', [0.0]) * size)
+        self.cpu_price = (array('d', [0.0]) * size, array('d', [0.0]) * size)
+        self.priced = bytearray(size)
 
-    # double cpuPrice = (laptop) ?
-    #         (((corePrice + threadPrice) * turbo) + yearPrice) * (passmark/5813) :
-    #         (((corePrice + threadPrice) * turbo) + yearPrice) * ((passmark/9530) * 0.67);
-    
-    base_cpu_calc = ((core_price + thread_price) * turbo) + year_price
-    
-    if laptop:
-        cpu_price = base_cpu_calc * (passmark / 5813.0)
-    else:
-        cpu_price = base_cpu_calc * ((passmark / 9530.0) * 0.67)
+    def _price_row(self, position):
+        year, cores, threads, clock, turbo, passmark = _unwrap_cpu(self.catalog.records[position])
+        for laptop in (0, 1):
+            turbo_ghz, base_cpu_calc, cpu_price = _cpu_component_prices(
+                year, cores, threads, turbo, passmark, laptop, self.prices)
+            self.base_cpu_calc[laptop][position] = base_cpu_calc
+            self.cpu_price[laptop][position] = cpu_price
+        self.turbo[position] = turbo_ghz
+        # Set last: another thread pricing the same row meanwhile just writes the same values
+        self.priced[position] = 1
 
-    # double finalPrice = (cpuPrice + ramPrice + drivePrice + gpuPrice + osModifier) + 40;
-    base_fee = prices.get('BASE_FEE', 40.0)
-    final_price = cpu_price + ram_price + drive_price + gpu_price + os_modifier + base_fee
+    def lookup(self, position, laptop):
+        """(turbo in GHz, base_cpu_calc, cpu_price) for a catalog position"""
+        if not self.priced[position]:
+            self._price_row(position)
+        laptop = 1 if laptop else 0
+        return self.turbo[position], self.base_cpu_calc[laptop][position], self.cpu_price[laptop][position]
+
+# catalog path -> CpuPriceTable
+_cpu_price_tables = {}
+_cpu_price_tables_lock = threading.Lock()
+
+def get_cpu_price_table(db_path='cpus.db', prices=None, catalog=None):
+    """
+    Returns the CPU price table for the current catalog and pricing config.
+    It is only rebuilt when the catalog changes or a CPU_* key in prices.txt does.
+    """
+    if prices is None:
+        prices = get_prices_config()
+    if catalog is None:
+        catalog = get_catalog(db_path)
+    table = _cpu_price_tables.get(catalog.path)
+    if table is not None and table.catalog is catalog and table.prices is prices:
+        return table
+    cpu_config = _cpu_config(prices)
+    with _cpu_price_tables_lock:
+        table = _cpu_price_tables.get(catalog.path)
+        if table is None or table.catalog is not catalog or table.cpu_config != cpu_config:
+            table = CpuPriceTable(catalog, prices)
+            _cpu_price_tables[catalog.path] = table
+        # Remember which config snapshot was checked, so the next call can skip the comparison
+        table.prices = prices
+    return table
+
+def add_cpu_prices(candidates, db_path='cpus.db'):
+    """
+    Adds 'cpu_price_laptop' and 'cpu_price_desktop' (rounded, as in the price breakdown)
+    to each candidate dict from get_cpu_candidates. Returns the same list.
+    """
+    table = get_cpu_price_table(db_path)
+    for candidate in candidates:
+        position = table.catalog.position(candidate['name'])
+        if position is not None:
+            candidate['cpu_price_laptop'] = round(table.lookup(position, True)[2])
+            candidate['cpu_price_desktop'] = round(table.lookup(position, False)[2])
+    return candidates
 
+def _price_result(db_name, year, cores, threads, clock, turbo, passmark,
+                  cpu_price, ram_price, drive_price, gpu_price, os_modifier, base_fee, final_price):
     return {
         'final_price': round(final_price),
         'breakdown': {
@@ -347,3 +487,157 @@ def calculate_price(specs, db_path='cpus.db', manual_passmark=None):
             'passmark': passmark
         }
     }
+
+def calculate_price(specs, db_path='cpus.db', manual_passmark=None):
+    """
+    Calculates the detailed price breakdown of the computer.
+    
+    specs: dict containing:
+        - cpu_name: str (Raw string from scanner)
+        - cpu_model_name: str (Optional: Specific DB name selected by user/logic)
+        - ram_gb: float
+        - ram_type: str ('DDR3', 'DDR4', 'DDR5')
+        - drives: list of dicts [{'type': 'HDD'/'SSD'/'NVMe', 'capacity_gb': float}]
+        - gpu_price: float (manual input)
+        - os_name: str ('Windows', 'Linux', 'macOS')
+        - is_laptop: bool
+    
+    manual_passmark: float (Optional override for passmark score)
+    
+    returns: dict with detailed price breakdown and total
+    """
+    
+    # Load Pricing Config
+    prices = get_prices_config()
+    
+    # 1. Determine CPU details
+    catalog = get_catalog(db_path)
+    cpu = _resolve_cpu(specs, db_path, manual_passmark, catalog)
+    laptop = specs.get('is_laptop', False)
+    
+    # 2. CPU price: a table lookup for catalog CPUs, the full formula otherwise
+    if cpu.position is not None:
+        table = get_cpu_price_table(db_path, prices, catalog)
+        turbo, base_cpu_calc, cpu_price = table.lookup(cpu.position, laptop)
+        if cpu.passmark_override:
+            cpu_price = _passmark_scaled(base_cpu_calc, cpu.passmark, laptop)
+    else:
+        turbo, base_cpu_calc, cpu_price = _cpu_component_prices(
+            cpu.year, cpu.cores, cpu.threads, cpu.turbo, cpu.passmark, laptop, prices)
+    
+    # RAM Price
+    ram_multiplier = _ram_multipliers(prices)[ram_type_code(specs.get('ram_type', ''))]
+    ram_price = specs['ram_gb'] * ram_multiplier
+
+    # Drive Price
+    drive_multipliers = _drive_multipliers(prices)
+    drive_price = 0
+    for drive in specs['drives']:
+        drive_price += drive['capacity_gb'] * drive_multipliers[drive_type_code(drive['type'])]
+
+    gpu_price = specs.get('gpu_price', 0.0)
+
+    # OS Modifier and Temp Calc
+    temp = base_cpu_calc + ram_price + drive_price + gpu_price
+    
+    os_mult = _os_multipliers(prices)[os_code(specs['os_name'])]
+        
+    # Logic: modifier is the difference from temp
+    # If os_mult is 0.85 (15% off), price is temp * 0.85. 
+    # The "modifier" value added to breakdown is (temp * 0.85) - temp = negative number
+    os_modifier = (os_mult * temp) - temp
+
+    # double finalPrice = (cpuPrice + ramPrice + drivePrice + gpuPrice + osModifier) + 40;
+    base_fee = prices.get('BASE_FEE', 40.0)
+    final_price = cpu_price + ram_price + drive_price + gpu_price + os_modifier + base_fee
+
+    return _price_result(cpu.name, cpu.year, cpu.cores, cpu.threads, cpu.clock, turbo, cpu.passmark,
+                         cpu_price, ram_price, drive_price, gpu_price, os_modifier, base_fee, final_price)
+
+def calculate_prices_batch(specs_list, db_path='cpus.db', manual_passmarks=None):
+    """
+    Prices many machines at once (e.g. a pallet or an inventory export).
+    
+    specs_list: list of specs dicts, as for calculate_price
+    manual_passmarks: optional list of passmark overrides, one per spec (None for no override)
+    
+    returns: list of breakdown dicts, identical to calling calculate_price on each spec.
+    The formulas run as NumPy array operations; without NumPy this falls back to a loop.
+    """
+    specs_list = list(specs_list)
+    if manual_passmarks is None:
+        manual_passmarks = [None] * len(specs_list)
+    if np is None:
+        return [calculate_price(specs, db_path, mp) for specs, mp in zip(specs_list, manual_passmarks)]
+    if not specs_list:
+        return []
+    
+    prices = get_prices_config()
+    n = len(specs_list)
+    
+    # CPU lookups stay scalar, but each distinct CPU/override pair is only resolved once per batch
+    catalog = get_catalog(db_path)
+    resolved = {}
+    cpus = []
+    for specs, mp in zip(specs_list, manual_passmarks):
+        model_name = specs.get('cpu_model_name')
+        if model_name and catalog.get(model_name) is not None:
+            key = (model_name, None, str(mp))
+        else:
+            key = (None, specs.get('cpu_name', ''), str(mp))
+        cpu = resolved.get(key)
+        if cpu is None:
+            cpu = resolved[key] = _resolve_cpu(specs, db_path, mp, catalog)
+        cpus.append(cpu)
+    turbos_ghz = [cpu.turbo / 1000.0 if cpu.turbo > 100 else cpu.turbo for cpu in cpus]
+    
+    year = np.array([cpu.year for cpu in cpus])
+    cores = np.array([cpu.cores for cpu in cpus])
+    threads = np.array([cpu.threads for cpu in cpus])
+    passmark = np.array([cpu.passmark for cpu in cpus], dtype=float)
+    turbo = np.array(turbos_ghz, dtype=float)
+    laptop = np.array([bool(specs.get('is_laptop', False)) for specs in specs_list])
+    
+    ram_codes = np.array([ram_type_code(specs.get('ram_type', '')) for specs in specs_list], dtype=np.intp)
+    os_codes = np.array([os_code(specs['os_name']) for specs in specs_list], dtype=np.intp)
+    ram_gb = np.array([specs['ram_gb'] for specs in specs_list], dtype=float)
+    gpu_price = np.array([specs.get('gpu_price', 0.0) for specs in specs_list], dtype=float)
+    
+    # Drives are flattened into one array per field, with the index of the machine they belong to
+    drive_owner, drive_cap, drive_codes = [], [], []
+    for i, specs in enumerate(specs_list):
+        for drive in specs['drives']:
+            drive_owner.append(i)
+            drive_cap.append(drive['capacity_gb'])
+            drive_codes.append(drive_type_code(drive['type']))
+    drive_owner = np.array(drive_owner, dtype=np.intp)
+    drive_cost = np.array(drive_cap, dtype=float) * np.array(_drive_multipliers(prices))[np.array(drive_codes, dtype=np.intp)]
+    # bincount adds each machine's drives in order, same as the scalar loop
+    drive_price = np.bincount(drive_owner, weights=drive_cost, minlength=n)
+    
+    # Same formulas (and operation order) as calculate_price
+    year_base = prices.get('CPU_YEAR_BASE', 2012)
+    year_mult = np.where(laptop, prices.get('CPU_YEAR_LAPTOP_MULT', 6), prices.get('CPU_YEAR_DESKTOP_MULT', 10))
+    year_price = (year - year_base) * year_mult
+    core_price = cores * (year_price * prices.get('CPU_CORE_MULT', 0.025))
+    thread_price = (threads - cores) * prices.get('CPU_THREAD_EXCESS_PRICE', 0.75)
+    
+    ram_price = ram_gb * np.array(_ram_multipliers(prices))[ram_codes]
+    
+    base_cpu_calc = ((core_price + thread_price) * turbo) + year_price
+    temp = base_cpu_calc + ram_price + drive_price + gpu_price
+    os_mult = np.array(_os_multipliers(prices))[os_codes]
+    os_modifier = (os_mult * temp) - temp
+    
+    cpu_price = np.where(laptop, base_cpu_calc * (passmark / 5813.0), base_cpu_calc * ((passmark / 9530.0) * 0.67))
+    
+    base_fee = prices.get('BASE_FEE', 40.0)
+    final_price = cpu_price + ram_price + drive_price + gpu_price + os_modifier + base_fee
+    
+    results = []
+    columns = zip(cpus, turbos_ghz, cpu_price.tolist(), ram_price.tolist(), drive_price.tolist(),
+                  gpu_price.tolist(), os_modifier.tolist(), final_price.tolist())
+    for cpu, turbo_ghz, cpu_p, ram_p, drive_p, gpu_p, os_mod, final_p in columns:
+        results.append(_price_result(cpu.name, cpu.year, cpu.cores, cpu.threads, cpu.clock, turbo_ghz, cpu.passmark,
+                                     cpu_p, ram_p, drive_p, gpu_p, os_mod, base_fee, final_p))
+    return results
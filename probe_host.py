@@ -0,0 +1,295 @@
+"""
+Everything the scanner asks of the machine goes through a probe host.
+
+LiveHost answers from the real machine. RecordingHost wraps it and keeps every answer with
+how long it took, and ReplayHost plays such a recording back (latencies included), so the
+Windows, macOS and Linux scan paths can all run, and be timed, on any machine.
+
+A recording is a JSON fixture:
+    {"profile": "windows_laptop", "calls": {"<method> <json args>": {"result": ..., "seconds": 0.12}}}
+Failed calls are stored as {"error": "<exception class>", "message": ..., "seconds": ...}.
+Hand-written fixtures, modeled on a machine rather than recorded on one, have "synthetic": true.
+"""
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+
+import psutil
+
+import smbios
+
+# Try to import wmi for Windows specific checks
+try:
+    import wmi
+except ImportError:
+    wmi = None
+
+# WMI is COM based, and every thread that uses it has to initialize COM first (ships with wmi's pywin32)
+try:
+    import pythoncom
+except ImportError:
+    pythoncom = None
+
+# Try to import cpuinfo
+try:
+    import cpuinfo
+except ImportError:
+    cpuinfo = None
+
+# Where distributions install the PCI ID database (hwdata / pciutils)
+PCI_IDS_PATHS = ['/usr/share/hwdata/pci.ids', '/usr/share/misc/pci.ids', '/usr/share/pci.ids', '/usr/share/pciids/pci.ids']
+
+def find_pci_ids(paths=PCI_IDS_PATHS):
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+def pci_names(ids, path=None):
+    """
+    Looks up (vendor, device) ID pairs in pci.ids.
+    Returns {(vendor, device): (vendor name, device name or None)} for the vendors found.
+    The file is sorted by vendor, so reading stops after the last vendor asked for.
+    """
+    path = path or find_pci_ids()
+    wanted = {}
+    for vendor, device in ids:
+        wanted.setdefault(vendor, set()).add(device)
+    names = {}
+    if not path or not wanted:
+        return names
+    last_vendor = max(wanted)
+    vendor = None
+    vendor_name = None
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                if line.startswith('C '): # Device classes follow the vendor list
+                    break
+                if not line.startswith('\t'):
+                    vendor = int(line[:4], 16)
+                    if vendor > last_vendor:
+                        break
+                    vendor_name = line[4:].strip()
+                    for device in wanted.get(vendor, ()):
+                        names[vendor, device] = (vendor_name, None)
+                elif vendor in wanted and not line.startswith('\t\t'):
+                    device = int(line[1:5], 16)
+                    if device in wanted[vendor]:
+                        names[vendor, device] = (vendor_name, line[5:].strip())
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+    return names
+
+class LiveHost:
+    """
+    The machine the scanner runs on.
+    Every method returns plain JSON-compatible values, so answers can be recorded and replayed.
+    """
+
+    def probe_started(self):
+        """Called on each probe thread before the probe runs"""
+        if pythoncom:
+            pythoncom.CoInitialize()
+
+    def probe_finished(self):
+        if pythoncom:
+            pythoncom.CoUninitialize()
+
+    def system(self):
+        return platform.system()
+
+    def release(self):
+        return platform.release()
+
+    def mac_version(self):
+        return platform.mac_ver()[0]
+
+    def processor(self):
+        return platform.processor()
+
+    def read_text(self, path):
+        """Stripped contents of a small text file, or None if it can't be read"""
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def listdir(self, path):
+        """Sorted directory entries. Raises OSError."""
+        return sorted(os.listdir(path))
+
+    def realpath(self, path):
+        return os.path.realpath(path)
+
+    def run(self, args, timeout):
+        """Runs a command. Returns [returncode, stdout]; raises OSError or subprocess.TimeoutExpired."""
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+        return [result.returncode, result.stdout]
+
+    def wmi_query(self, class_name, properties):
+        """Instances of a WMI class as dicts of the given properties. Raises if WMI is unavailable."""
+        if wmi is None:
+            raise OSError("wmi is not available")
+        return [{name: getattr(item, name, None) for name in properties}
+                for item in getattr(wmi.WMI(), class_name)()]
+
+    def registry_values(self, key_path, names):
+        """Values under an HKEY_LOCAL_MACHINE key, leaving out the missing ones. Raises OSError."""
+        try:
+            import winreg
+        except ImportError:
+            raise OSError("winreg is not available")
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path)
+        values = {}
+        for name in names:
+            try:
+                values[name] = winreg.QueryValueEx(key, name)[0]
+            except FileNotFoundError:
+                pass
+        return values
+
+    def cpu_brand(self):
+        """CPU brand string from py-cpuinfo, or None without py-cpuinfo"""
+        return cpuinfo.get_cpu_info().get('brand_raw') if cpuinfo else None
+
+    def cpu_count(self, logical):
+        return psutil.cpu_count(logical=logical)
+
+    def memory_total(self):
+        return psutil.virtual_memory().total
+
+    def disk_partitions(self):
+        return [{'device': p.device, 'mountpoint': p.mountpoint} for p in psutil.disk_partitions()]
+
+    def disk_total(self, mountpoint):
+        """Size of the file system at mountpoint in bytes. Raises PermissionError."""
+        return psutil.disk_usage(mountpoint).total
+
+    def battery_present(self):
+        return psutil.sensors_battery() is not None
+
+    def pci_names(self, ids):
+        """[[vendor, device, vendor name, device name or None], ...] for the [vendor, device] pairs pci.ids knows"""
+        return [[vendor, device, vendor_name, device_name]
+                for (vendor, device), (vendor_name, device_name) in pci_names([tuple(i) for i in ids]).items()]
+
+    def memory_devices(self):
+        """SMBIOS Type 17 memory modules (see smbios.read_memory_devices), or None if unreadable"""
+        modules = smbios.read_memory_devices()
+        return None if modules is None else list(modules)
+
+# Host methods that don't talk to the machine, and so are neither recorded nor replayed
+_LOCAL_METHODS = ('probe_started', 'probe_finished')
+
+def _call_key(method, args):
+    return f"{method} {json.dumps(list(args))}"
+
+class RecordingHost:
+    """Wraps a host and records each answer (or exception) with its latency"""
+
+    def __init__(self, host=None, profile=None):
+        self.host = host or LiveHost()
+        self.profile = profile
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, method):
+        target = getattr(self.host, method)
+        if method in _LOCAL_METHODS:
+            return target
+
+        def record(*args):
+            start = time.perf_counter()
+            try:
+                result = target(*args)
+            except Exception as e:
+                entry = {'error': type(e).__name__, 'message': str(e)}
+                raise
+            else:
+                # Round trip through JSON now, so the live answer and its replay are the same value
+                result = json.loads(json.dumps(result, default=str))
+                entry = {'result': result}
+                return result
+            finally:
+                entry['seconds'] = round(time.perf_counter() - start, 4)
+                with self._lock:
+                    self.calls[_call_key(method, args)] = entry
+        return record
+
+    def fixture(self):
+        return {'profile': self.profile, 'recorded_on': platform.platform(), 'calls': dict(sorted(self.calls.items()))}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.fixture(), f, indent=1)
+            f.write('\n')
+
+# Exceptions a replayed call can raise, by recorded class name
+_REPLAY_ERRORS = {
+    'FileNotFoundError': FileNotFoundError,
+    'PermissionError': PermissionError,
+    'TimeoutExpired': lambda message: subprocess.TimeoutExpired(message, 0),
+}
+
+# What a call that isn't in the recording returns: the answer of a machine without that file or tool
+_NOT_RECORDED = {
+    'read_text': None,
+    'exists': False,
+    'cpu_brand': None,
+    'memory_devices': None,
+    'pci_names': [],
+    'battery_present': False,
+}
+
+class ReplayHost:
+    """
+    Answers from a recording, waiting each call's recorded latency times `speed`
+    (0 replays instantly). Calls missing from the recording are collected in `missing`.
+    """
+
+    def __init__(self, fixture, speed=1.0):
+        self.profile = fixture.get('profile')
+        self.calls = fixture['calls']
+        self.speed = speed
+        self.missing = set()
+
+    @classmethod
+    def load(cls, path, speed=1.0):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), speed)
+
+    def probe_started(self):
+        pass
+
+    def probe_finished(self):
+        pass
+
+    def __getattr__(self, method):
+        if method.startswith('_') or not hasattr(LiveHost, method):
+            raise AttributeError(method)
+
+        def replay(*args):
+            key = _call_key(method, args)
+            entry = self.calls.get(key)
+            if entry is None:
+                self.missing.add(key)
+                if method in _NOT_RECORDED:
+                    return _NOT_RECORDED[method]
+                raise OSError(f"not recorded: {key}")
+            if self.speed and entry.get('seconds'):
+                time.sleep(entry['seconds'] * self.speed)
+            if 'error' in entry:
+                raise _REPLAY_ERRORS.get(entry['error'], OSError)(entry.get('message', entry['error']))
+            # Copied, since the probes are free to modify what they get
+            return json.loads(json.dumps(entry['result']))
+        return replay
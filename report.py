@@ -1,39 +1,309 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc, pdfmetrics
 from reportlab.lib import colors
+from reportlab.lib.boxstuff import aspectRatioFix
 from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
 from reportlab.platypus import Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+import copy
 import datetime
+import functools
+import io
 import os
+import re
+import sys
+import threading
+import uuid
+
+# Feature checklist on every sheet: (custom_fields['features'] key, label), drawn in 2 columns
+ALL_FEATURES = [
+    ('wifi', 'WiFi'),
+    ('bluetooth', 'Bluetooth'),
+    ('webcam', 'Webcam'),
+    ('touchscreen', 'Touchscreen'),
+    ('sound', 'Sound'),
+    ('microphone', 'Microphone')
+]
+
+@functools.lru_cache(maxsize=4096)
+def text_width(text, font_name, font_size):
+    """pdfmetrics.stringWidth, remembered: software names and note words repeat on every sheet"""
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+def wrap_words(text, font_name, font_size, max_width):
+    """Splits text into lines narrower than max_width, adding up cached word widths"""
+    space = text_width(' ', font_name, font_size)
+    lines = []
+    line = []
+    line_width = 0
+    for word in text.split():
+        word_width = text_width(word, font_name, font_size)
+        new_width = line_width + space + word_width if line else word_width
+        if new_width < max_width:
+            line.append(word)
+            line_width = new_width
+        else:
+            lines.append(' '.join(line))
+            line = [word]
+            line_width = word_width
+    if line:
+        lines.append(' '.join(line))
+    return lines
+
+class EmbeddedImage:
+    """
+    An image decoded and compressed for PDF once, then added to any number of documents.
+    canvas.drawImage decodes, compresses and ASCII85-encodes the file again for every PDF.
+
+    This uses reportlab internals (PDFImageXObject._smask, canvas._doc, doc.idToObject), checked
+    against the reportlab version pinned in requirements.txt. If they are missing, the image is
+    drawn with plain drawImage instead: slower, but the logo is never lost.
+    """
+
+    def __init__(self, path, name, mask='auto'):
+        self.name = name
+        self.mask = mask
+        self.reader = ImageReader(path)
+        try:
+            self.xobject = pdfdoc.PDFImageXObject(name, self.reader, mask=mask)
+            # The alpha channel, as a separate soft mask image
+            self.smask = getattr(self.xobject, '_smask', None)
+            if self.smask is not None:
+                del self.xobject._smask
+        except Exception as e:
+            print(f"Sharing the {name} image between PDFs is unavailable ({e}), using drawImage")
+            self.xobject = None
+        self.width, self.height = self.reader.getSize()
+
+    def draw(self, c, x, y, width, height, anchor='c'):
+        """Like c.drawImage(..., preserveAspectRatio=True, anchor=anchor)"""
+        doc = getattr(c, '_doc', None)
+        if self.xobject is None or not hasattr(doc, 'idToObject'):
+            c.drawImage(self.reader, x, y, width=width, height=height, mask=self.mask,
+                        preserveAspectRatio=True, anchor=anchor)
+            return
+        reg_name = doc.getXObjectName(self.name)
+        if reg_name not in doc.idToObject:
+            # Each document registers its own shallow copy; the encoded image data is shared
+            xobject = copy.copy(self.xobject)
+            if self.smask is not None:
+                xobject.smask = doc.Reference(copy.copy(self.smask), doc.getXObjectName(self.smask.name))
+            doc.Reference(xobject, reg_name)
+        x, y, width, height, _ = aspectRatioFix(True, anchor, x, y, width, height, self.width, self.height)
+        c.saveState()
+        c.translate(x, y)
+        c.scale(width, height)
+        c.doForm(self.name)
+        c.restoreState()
+
+class SheetTemplate:
+    """
+    The parts of a build sheet that are the same on every sheet: logo, separator line, section
+    headings, the feature checkbox grid, the price box and the barcode frame.
+    Laid out once per process (see get_sheet_template) and put into each PDF as Form XObjects,
+    so a sheet only draws its own text and check marks on top. A form is stored once per file
+    and shared by every page using it, which is what makes generate_pdfs cheap per sheet.
+
+    The header form sits at a fixed place on the page. The features and price forms move with
+    the content above them, so they are drawn relative to a baseline y (see draw_features,
+    draw_price_box).
+
+    It also holds everything else the sheets share read-only: the logo, ready to embed,
+    the paragraph and table styles. Nothing in it is changed after __init__, so sheets can be
+    drawn from any number of threads at once.
+    """
+    HEADER_FORM = 'SheetHeader'
+    FEATURES_FORM = 'SheetFeatures'
+    PRICE_FORM = 'SheetPrice'
+
+    # Price box and barcode frame, relative to the price baseline
+    BOX_X = 50
+    BOX_W = 200
+    BARCODE_W = 120 # 15% narrower (was 150)
+    BARCODE_H = 40  # 15% taller (was 40)
+
+    def __init__(self, pagesize=letter):
+        self.width, self.height = pagesize
+        # Support frozen app
+        if getattr(sys, 'frozen', False):
+            base_path = sys._MEIPASS
+        else:
+            base_path = os.path.dirname(os.path.abspath(__file__))
+        logo_path = os.path.join(base_path, 'resources', 'logo.png')
+        self.logo = EmbeddedImage(logo_path, 'SheetLogo') if os.path.exists(logo_path) else None
+
+        # We need to use Paragraphs for mixed formatting (Bold Label + Normal Value inline)
+        self.body_style = ParagraphStyle('SheetBody', parent=getSampleStyleSheet()["Normal"],
+                                         fontName="Helvetica", fontSize=12, leading=16)
+        # Specs table: a clean layout with bold labels
+        self.spec_table_style = TableStyle([
+            ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
+            ('FONTNAME', (1,0), (1,-1), 'Helvetica'),
+            ('FONTSIZE', (0,0), (-1,-1), 12),
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('ALIGN', (0,0), (0,-1), 'LEFT'),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 10),
+            ('RIGHTPADDING', (0,0), (0,-1), 20),
+        ])
+
+        # Header: model, serial and date lines, then the separator and the specs heading
+        self.separator_y = self.height - 115
+        self.specs_heading_y = self.separator_y - 40
+        self.specs_top = self.specs_heading_y - 30
+
+        # Feature grid: (key, label, x, y below the heading baseline) per checkbox
+        col1_x = 60
+        col2_x = 250
+        self.feature_boxes = [(key, label, col1_x if i % 2 == 0 else col2_x, -30 - 20 * (i // 2))
+                              for i, (key, label) in enumerate(ALL_FEATURES)]
+        # Space the features section takes below its heading baseline
+        self.features_height = 30 + 20 * ((len(ALL_FEATURES) + 1) // 2) + 20
+
+        self.barcode_x = self.BOX_X + (self.BOX_W - self.BARCODE_W) / 2
+        self.barcode_y = -60 - 20 - self.BARCODE_H # 20px gap below price box
+
+    def define_forms(self, c):
+        """Adds the static forms to the canvas' document. Call once per file, before any page."""
+        width, height = self.width, self.height
+
+        c.beginForm(self.HEADER_FORM)
+        if self.logo:
+            # Position logo in top right corner
+            # x = width - image_width - margin
+            self.logo.draw(c, width - 180, height - 100, 150, 75, anchor='ne')
+        # Separator Line
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(2)
+        c.line(50, self.separator_y, width - 50, self.separator_y)
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(50, self.specs_heading_y, "Hardware Specifications")
+        c.endForm()
+
+        # Drawn translated to the heading baseline, so the box reaches below 0
+        c.beginForm(self.FEATURES_FORM, lowerx=0, lowery=-self.features_height, upperx=width, uppery=20)
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(50, 0, "Features & Connectivity")
+        c.setFont("Helvetica", 12)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1)
+        c.setFillColor(colors.black)
+        for key, label, x, y in self.feature_boxes:
+            c.rect(x, y, 10, 10, fill=0, stroke=1)
+            c.drawString(x + 18, y + 1, label)
+        c.endForm()
+
+        c.beginForm(self.PRICE_FORM, lowerx=0, lowery=self.barcode_y - 5, upperx=width, uppery=15)
+        c.setStrokeColor(colors.black)
+        c.setFillColor(colors.HexColor('#e8f8f5')) # Light green bg
+        c.rect(self.BOX_X, -60, self.BOX_W, 70, fill=1, stroke=1)
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold", 16)
+        c.drawCentredString(self.BOX_X + (self.BOX_W/2), -15, "TOTAL PRICE")
+        # Barcode Placeholder
+        # Small black outline rectangle below the price box
+        c.setLineWidth(1)
+        c.rect(self.barcode_x, self.barcode_y, self.BARCODE_W, self.BARCODE_H, fill=0, stroke=1)
+        c.endForm()
+
+    def draw_header(self, c):
+        c.doForm(self.HEADER_FORM)
+
+    def draw_features(self, c, y, features):
+        """Feature grid with its heading at baseline y, checking the included ones. Returns the y below it."""
+        c.saveState()
+        c.translate(0, y)
+        c.doForm(self.FEATURES_FORM)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1.5)
+        for key, label, x, box_y in self.feature_boxes:
+            if features.get(key, False):
+                draw_checkmark(c, x, box_y)
+        c.restoreState()
+        return y - self.features_height
+
+    def draw_price_box(self, c, price_y, final_price):
+        """Price box and barcode frame below baseline price_y. Returns the y below the barcode."""
+        c.saveState()
+        c.translate(0, price_y)
+        c.doForm(self.PRICE_FORM)
+        c.setFont("Helvetica-Bold", 26)
+        c.setFillColor(colors.HexColor('#27ae60'))
+        # Force integer formatting with .0f
+        c.drawCentredString(self.BOX_X + (self.BOX_W/2), -45, f"${final_price:.0f}")
+        c.restoreState()
+        return price_y + self.barcode_y - 20 # Move down past barcode box
+
+def draw_checkmark(c, x, y):
+    """Check mark inside the 10pt checkbox at x, y (stroked with the current line width)"""
+    p = c.beginPath()
+    p.moveTo(x + 2, y + 5)
+    p.lineTo(x + 4, y + 2)
+    p.lineTo(x + 8, y + 8)
+    c.drawPath(p, stroke=1, fill=0)
+
+_sheet_template = None
+_sheet_template_lock = threading.Lock()
+
+def get_sheet_template():
+    """The letter-size SheetTemplate, laid out on first use and shared by every sheet after that"""
+    global _sheet_template
+    with _sheet_template_lock:
+        if _sheet_template is None:
+            _sheet_template = SheetTemplate()
+        return _sheet_template
 
 def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf"):
     """
     Generates a PDF report with the specs and price breakdown.
     New Layout: Logo TR, Header TL, Specs List, OS Bottom.
     """
+    return generate_pdfs([(specs, price_data, custom_fields)], filename)
+
+def render_pdf(specs, price_data, custom_fields=None):
+    """generate_pdf into memory: returns the PDF as bytes, nothing is written to disk"""
+    buffer = io.BytesIO()
+    generate_pdf(specs, price_data, custom_fields, filename=buffer)
+    return buffer.getvalue()
+
+def sheet_filename(serial_number=None):
+    """
+    A file name no other build sheet will have, e.g. "BuildSheet_20240131-154502_7XK2JF2_3f9c1a2b.pdf".
+    The serial is reduced to characters that are safe in a file name on every OS.
+    """
+    timestamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    label = re.sub(r'[^A-Za-z0-9_.-]+', '_', serial_number or '').strip('_.')
+    parts = ['BuildSheet', timestamp] + ([label] if label else []) + [uuid.uuid4().hex[:8]]
+    return '_'.join(parts) + '.pdf'
+
+def generate_pdfs(sheets, filename="BuildSheets.pdf"):
+    """
+    Several build sheets in one PDF, one page each, for printing a whole batch at once.
+    sheets: iterable of (specs, price_data, custom_fields) as for generate_pdf.
+    filename may also be a binary file object (e.g. io.BytesIO) to write to.
+    The static layout (logo included) is stored once in the file however many sheets it has.
+    """
+    c = canvas.Canvas(filename, pagesize=letter)
+    template = get_sheet_template()
+    template.define_forms(c)
+    for specs, price_data, custom_fields in sheets:
+        draw_sheet(c, template, specs, price_data, custom_fields)
+        c.showPage()
+    c.save()
+    return filename
+
+def draw_sheet(c, template, specs, price_data, custom_fields=None):
+    """Draws one build sheet on the canvas' current page (the template's forms must be defined)"""
     if custom_fields is None:
         custom_fields = {}
-    
-    c = canvas.Canvas(filename, pagesize=letter)
-    width, height = letter
-    
+
+    width, height = template.width, template.height
+
     # --- Header Section ---
-    
-    # 1. Logo Analysis (Top Right)
-    # Support frozen app
-    import sys
-    if getattr(sys, 'frozen', False):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        
-    logo_path = os.path.join(base_path, 'resources', 'logo.png')
-    
-    if os.path.exists(logo_path):
-        # Position logo in top right corner
-        # x = width - image_width - margin
-        c.drawImage(logo_path, width - 180, height - 100, width=150, height=75, preserveAspectRatio=True, mask='auto', anchor='ne')
+
+    # 1. Logo, separator and specs heading
+    template.draw_header(c)
 
     # 2. Computer Info (Top Left)
     y = height - 50
@@ -57,25 +327,11 @@ def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf
     else:
         c.drawString(50, y, f"Date: {date_str}")
         
-    y -= 25
-    # Separator Line
-    c.setStrokeColor(colors.black)
-    c.setLineWidth(2)
-    c.line(50, y, width - 50, y)
-    y -= 40
-    
     # --- Specs Section ---
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, y, "Hardware Specifications")
-    y -= 30 # Increased initial gap slightly
-    
-    # We need to use Paragraphs for mixed formatting (Bold Label + Normal Value inline)
-    styles = getSampleStyleSheet()
-    normal_style = styles["Normal"]
-    normal_style.fontName = "Helvetica"
-    normal_style.fontSize = 12
-    normal_style.leading = 16
-    
+    y = template.specs_top
+
+    normal_style = template.body_style
+
     # 1. CPU Section (Split into two lines)
     custom_cpu = custom_fields.get('custom_cpu')
     
@@ -163,79 +419,14 @@ def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf
             spec_rows.append(["Battery Duration", f"{custom_fields.get('battery_duration')} Hours"])
 
     # Draw Specs Table
-    # Use a clean layout, maybe bold labels
-    t_style = TableStyle([
-        ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
-        ('FONTNAME', (1,0), (1,-1), 'Helvetica'),
-        ('FONTSIZE', (0,0), (-1,-1), 12),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ('ALIGN', (0,0), (0,-1), 'LEFT'),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (0,-1), 20),
-    ])
-    
     t = Table(spec_rows, colWidths=[1.5*inch, 5*inch])
-    t.setStyle(t_style)
+    t.setStyle(template.spec_table_style)
     w, h = t.wrap(width, height)
     t.drawOn(c, 50, y - h)
     y -= (h + 30)
 
     # --- Features Section (Checklist) ---
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, y, "Features & Connectivity")
-    y -= 30
-    
-    features = custom_fields.get('features', {})
-    
-    c.setFont("Helvetica", 12)
-    
-    # List of all features to display
-    all_features = [
-        ('wifi', 'WiFi'),
-        ('bluetooth', 'Bluetooth'),
-        ('webcam', 'Webcam'),
-        ('touchscreen', 'Touchscreen'),
-        ('sound', 'Sound'),
-        ('microphone', 'Microphone')
-    ]
-    
-    # Display in 2 columns
-    col1_x = 60
-    col2_x = 250
-    
-    for i, (key, label) in enumerate(all_features):
-        is_included = features.get(key, False)
-        x_pos = col1_x if i % 2 == 0 else col2_x
-        
-        # Checkbox style
-        box_size = 10
-        c.setStrokeColor(colors.black)
-        c.setLineWidth(1)
-        
-        # Draw box
-        c.rect(x_pos, y, box_size, box_size, fill=0, stroke=1)
-        
-        # Draw checkmark inside if included
-        if is_included:
-            c.setLineWidth(1.5)
-            # Simple checkmark path
-            p = c.beginPath()
-            p.moveTo(x_pos + 2, y + 5)
-            p.lineTo(x_pos + 4, y + 2)
-            p.lineTo(x_pos + 8, y + 8)
-            c.drawPath(p, stroke=1, fill=0)
-            c.setLineWidth(1) # Reset
-            
-        c.setFillColor(colors.black)
-        c.drawString(x_pos + 18, y + 1, label)
-        
-        if i % 2 != 0:
-            y -= 20
-            
-    if len(all_features) % 2 != 0:
-        y -= 20
-        
-    y -= 20
+    y = template.draw_features(c, y, custom_fields.get('features', {}))
     
     # --- Software Included Section ---
     c.setFont("Helvetica-Bold", 14)
@@ -252,8 +443,7 @@ def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf
     
     for sw in software_list:
         # Calculate width of this item
-        text_width = c.stringWidth(sw, "Helvetica", 10)
-        item_total_width = text_width + 40 # 15 for checkbox/gap + text + 25 padding
+        item_total_width = text_width(sw, "Helvetica", 10) + 40 # 15 for checkbox/gap + text + 25 padding
         
         # Check if we need to wrap
         if sw_x + item_total_width > (width - 50):
@@ -263,12 +453,8 @@ def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf
         # Checkbox (Always checked)
         c.rect(sw_x, y, 10, 10, fill=0, stroke=1)
         # Checkmark
-        p = c.beginPath()
-        p.moveTo(sw_x + 2, y + 5)
-        p.lineTo(sw_x + 4, y + 2)
-        p.lineTo(sw_x + 8, y + 8)
         c.setLineWidth(1.5)
-        c.drawPath(p, stroke=1, fill=0)
+        draw_checkmark(c, sw_x, y)
         c.setLineWidth(1) # Reset
         
         c.drawString(sw_x + 15, y + 1, sw)
@@ -303,39 +489,8 @@ def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf
         c.setFillColor(colors.black)
         price_y -= 15
         
-    # Final Price Box
-    # Final Price Box (Left Aligned)
-    box_x = 50
-    box_w = 200
-    
-    c.setStrokeColor(colors.black)
-    c.setFillColor(colors.HexColor('#e8f8f5')) # Light green bg
-    c.rect(box_x, price_y - 60, box_w, 70, fill=1, stroke=1)
-    
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(box_x + (box_w/2), price_y - 15, "TOTAL PRICE")
-    c.setFont("Helvetica-Bold", 26)
-    c.setFillColor(colors.HexColor('#27ae60'))
-    # Force integer formatting with .0f
-    c.drawCentredString(box_x + (box_w/2), price_y - 45, f"${final_price:.0f}")
-    c.setFillColor(colors.black)
-    
-    # Barcode Placeholder
-    # Small black outline rectangle below the price box
-    barcode_w = 120 # 15% narrower (was 150)
-    barcode_h = 40  # 15% taller (was 40)
-    barcode_x = box_x + (box_w - barcode_w) / 2
-    barcode_y = price_y - 60 - 20 - barcode_h # 20px gap below price box
-    
-    c.setStrokeColor(colors.black)
-    c.setLineWidth(1)
-    c.rect(barcode_x, barcode_y, barcode_w, barcode_h, fill=0, stroke=1)
-    
-    c.setFont("Helvetica", 8)
-    c.drawCentredString(barcode_x + (barcode_w/2), barcode_y + 15, "")
-    
-    y = barcode_y - 20 # Move down past barcode box
+    # Final Price Box (Left Aligned) and barcode frame
+    y = template.draw_price_box(c, price_y, final_price)
 
     # --- Notes ---
     if custom_fields.get('notes'):
@@ -343,26 +498,8 @@ def generate_pdf(specs, price_data, custom_fields=None, filename="BuildSheet.pdf
         c.drawString(50, y, "Notes:")
         y -= 20
         c.setFont("Helvetica", 11)
-        # Wrap notes
-        text_obj = c.beginText(50, y)
-        text_obj.setFont("Helvetica", 10)
-        # simplistic wrapping for reportlab textobject?
-        # Better to use string drawing with manual wrap or Paragraph (but requires platypus flow)
-        # Using the manual wrap logic from before for safety
-        max_w = width - 100
-        words = custom_fields['notes'].split()
-        line = []
-        for word in words:
-            if c.stringWidth(' '.join(line + [word]), "Helvetica", 10) < max_w:
-                line.append(word)
-            else:
-                c.drawString(50, y, ' '.join(line))
-                y -= 14
-                line = [word]
-        if line:
-            c.drawString(50, y, ' '.join(line))
+        # Wrap notes (measured in the 10pt metrics, as before)
+        for line in wrap_words(custom_fields['notes'], "Helvetica", 10, width - 100):
+            c.drawString(50, y, line)
             y -= 14
         y -= 20
-
-    c.save()
-    return filename
@@ -0,0 +1,243 @@
+"""
+Headless bulk repricing for inventory files.
+
+Streams machine specs from a CSV or JSONL file, prices them across a pool of worker
+processes and streams the results out again, so memory use stays flat no matter how
+many machines are in the file.
+
+    python reprice.py inventory.csv repriced.csv
+    python reprice.py inventory.jsonl - --workers 8 > repriced.jsonl
+
+CSV columns (all optional except ram_gb/os_name, extra columns are passed through):
+    cpu_name, cpu_model_name, ram_gb, ram_type, drives, gpu_price, os_name, is_laptop, manual_passmark
+    drives is written as "256:SSD;1000:HDD"
+JSONL lines are specs dicts as used by pricing.calculate_price, plus an optional manual_passmark.
+"""
+import argparse
+import collections
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import pricing
+
+# A JSONL line that isn't a JSON object; it is written out as an error row instead of being priced
+InvalidRecord = collections.namedtuple('InvalidRecord', 'line text error')
+
+PRICE_COLUMNS = ['cpu_model', 'cpu_price', 'ram_price', 'drive_price', 'gpu_price', 'os_modifier', 'base_fee', 'final_price', 'error']
+
+def parse_drives(value):
+    """'256:SSD;1000:HDD' -> [{'capacity_gb': 256.0, 'type': 'SSD'}, ...]"""
+    drives = []
+    for part in (value or '').split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        capacity, _, drive_type = part.partition(':')
+        drives.append({'capacity_gb': float(capacity), 'type': drive_type.strip() or 'SSD'})
+    return drives
+
+def parse_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'laptop')
+
+def specs_from_csv_row(row):
+    """Converts a CSV row (all strings) to (specs, manual_passmark)"""
+    specs = {
+        'cpu_name': row.get('cpu_name', ''),
+        'ram_gb': float(row.get('ram_gb') or 0),
+        'ram_type': row.get('ram_type', ''),
+        'drives': parse_drives(row.get('drives')),
+        'gpu_price': float(row.get('gpu_price') or 0),
+        'os_name': row.get('os_name', ''),
+        'is_laptop': parse_bool(row.get('is_laptop', '')),
+    }
+    if row.get('cpu_model_name'):
+        specs['cpu_model_name'] = row['cpu_model_name']
+    return specs, row.get('manual_passmark') or None
+
+def specs_from_json(record):
+    """Fills in the defaults calculate_price expects for a JSONL record"""
+    specs = dict(record)
+    manual_passmark = specs.pop('manual_passmark', None)
+    specs.setdefault('cpu_name', '')
+    specs.setdefault('ram_gb', 0)
+    specs.setdefault('drives', [])
+    specs.setdefault('gpu_price', 0.0)
+    specs.setdefault('os_name', '')
+    return specs, manual_passmark
+
+def price_record(record, is_csv):
+    """Prices one input record. Returns a dict of the PRICE_COLUMNS values."""
+    if isinstance(record, InvalidRecord):
+        return {'error': record.error}
+    try:
+        specs, manual_passmark = specs_from_csv_row(record) if is_csv else specs_from_json(record)
+        if not specs.get('cpu_model_name'):
+            candidates = pricing.get_cpu_candidates(specs['cpu_name'], limit=1)
+            if candidates:
+                specs['cpu_model_name'] = candidates[0]['name']
+        price_data = pricing.calculate_price(specs, manual_passmark=manual_passmark)
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+    result = dict(price_data['breakdown'])
+    result['final_price'] = price_data['final_price']
+    result['error'] = ''
+    return result
+
+def price_chunk(chunk, is_csv):
+    return [price_record(record, is_csv) for record in chunk]
+
+def _init_worker():
+    # Pricing warnings ("CPU not found") go to stderr so they never mix with results on stdout
+    sys.stdout = sys.stderr
+    pricing.get_cpu_price_table()
+
+def read_records(path, is_csv):
+    """
+    Yields input records one at a time (dicts of strings for CSV, parsed objects for JSONL).
+    JSONL lines that aren't a JSON object come out as InvalidRecords, so one bad line doesn't stop the run.
+    """
+    f = sys.stdin if path == '-' else open(path, 'r', newline='', encoding='utf-8')
+    try:
+        if is_csv:
+            yield from csv.DictReader(f)
+        else:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield InvalidRecord(number, line, f"line {number}: invalid JSON: {e}")
+                    continue
+                if isinstance(record, dict):
+                    yield record
+                else:
+                    yield InvalidRecord(number, line, f"line {number}: expected a JSON object, got {type(record).__name__}")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def priced_chunks(chunks, is_csv, workers):
+    """
+    Yields (chunk, results) in input order.
+    At most 2 chunks per worker are in flight, so a huge input never piles up in memory.
+    """
+    if workers <= 1:
+        pricing.get_cpu_price_table()
+        for chunk in chunks:
+            with contextlib.redirect_stdout(sys.stderr):
+                results = price_chunk(chunk, is_csv)
+            yield chunk, results
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.apply_async(price_chunk, (chunk, is_csv))))
+            if len(pending) >= workers * 2:
+                done_chunk, result = pending.popleft()
+                yield done_chunk, result.get()
+        while pending:
+            done_chunk, result = pending.popleft()
+            yield done_chunk, result.get()
+
+def output_fields(record):
+    """The input columns written for a record: itself, or the line number and text of an InvalidRecord"""
+    if isinstance(record, InvalidRecord):
+        return {'line': record.line, 'input': record.text}
+    return dict(record)
+
+class CsvResultWriter:
+    """Writes input columns followed by the price columns"""
+
+    def __init__(self, f):
+        self.f = f
+        self.writer = None
+
+    def write(self, record, result):
+        if self.writer is None:
+            fields = output_fields(record)
+            fieldnames = list(fields.keys()) + [c for c in PRICE_COLUMNS if c not in fields]
+            self.writer = csv.DictWriter(self.f, fieldnames=fieldnames, extrasaction='ignore')
+            self.writer.writeheader()
+        row = output_fields(record)
+        row.update(result)
+        self.writer.writerow(row)
+
+class JsonlResultWriter:
+    """Writes each input record with a 'pricing' key added"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, record, result):
+        out = output_fields(record)
+        out['pricing'] = result
+        self.f.write(json.dumps(out) + '\n')
+
+def is_csv_path(path, fmt):
+    if fmt:
+        return fmt == 'csv'
+    return not path.lower().endswith(('.jsonl', '.ndjson', '.json'))
+
+def reprice(input_path, output_path, workers=None, chunk_size=500, input_format=None, output_format=None):
+    """
+    Reprices every machine in input_path and writes the results to output_path ('-' for stdin/stdout).
+    Returns (rows, seconds).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    in_csv = is_csv_path(input_path, input_format)
+    out_csv = is_csv_path(output_path, output_format) if output_path != '-' else (output_format or ('csv' if in_csv else 'jsonl')) == 'csv'
+
+    out = sys.stdout if output_path == '-' else open(output_path, 'w', newline='', encoding='utf-8')
+    writer = CsvResultWriter(out) if out_csv else JsonlResultWriter(out)
+    start = time.perf_counter()
+    rows = 0
+    try:
+        chunks = chunked(read_records(input_path, in_csv), chunk_size)
+        for chunk, results in priced_chunks(chunks, in_csv, workers):
+            for record, result in zip(chunk, results):
+                writer.write(record, result)
+            rows += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"\r{rows} machines priced ({rows / elapsed:.0f}/s)", end='', file=sys.stderr, flush=True)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    return rows, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprice an inventory file (CSV or JSONL) with the current prices.txt")
+    parser.add_argument('input', help="inventory file, or - for stdin")
+    parser.add_argument('output', help="results file, or - for stdout")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count, 1 = no pool)")
+    parser.add_argument('--chunk-size', type=int, default=500, help="machines per worker task (default: 500)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help="override detection by file extension")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help="override detection by file extension")
+    args = parser.parse_args()
+
+    rows, elapsed = reprice(args.input, args.output, args.workers, args.chunk_size,
+                            args.input_format, args.output_format)
+    rate = rows / elapsed if elapsed else 0
+    print(f"Repriced {rows} machines in {elapsed:.2f}s ({rate:.0f} machines/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
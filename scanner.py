@@ -1,20 +1,58 @@
+import concurrent.futures
+import copy
+import datetime
 import platform
 import psutil
 import json
+import math
 import os
-import sys
+import stat
+import tempfile
+import threading
+import time
 
-# Try to import wmi for Windows specific checks
-try:
-    import wmi
-except ImportError:
-    wmi = None
+import probe_host
+import smbios
 
-# Try to import cpuinfo
-try:
-    import cpuinfo
-except ImportError:
-    cpuinfo = None
+# The machine being scanned. Probes only talk to it through this, so a recorded machine
+# (probe_host.ReplayHost) can stand in for it.
+HOST = probe_host.LiveHost()
+
+# Whole scan gives up on the remaining probes after this many seconds
+SCAN_BUDGET = 8.0
+
+def _user_cache_dir():
+    """This user's cache directory for the app (%LOCALAPPDATA% on Windows, ~/.cache elsewhere)"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'buildsheet')
+
+# Scan results are reused until the next reboot. The cache is private to the user running the
+# scan (often root), since whatever is in it gets priced.
+SCAN_CACHE_PATH = os.path.join(_user_cache_dir(), 'scan_cache.json')
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+MACHINE_ID_PATH = '/etc/machine-id'
+
+# Linux exposes everything the scan needs as plain files, no helper processes required
+OS_RELEASE = '/etc/os-release'
+PROC_CPUINFO = '/proc/cpuinfo'
+SYS_PCI_DEVICES = '/sys/bus/pci/devices'
+DMI_DIR = '/sys/class/dmi/id'
+SYS_BLOCK = '/sys/block'
+# Vendor names as lspci prints them, for systems without a pci.ids
+PCI_GPU_VENDORS = {
+    0x1002: "Advanced Micro Devices, Inc. [AMD/ATI]",
+    0x10de: "NVIDIA Corporation",
+    0x8086: "Intel Corporation",
+    0x1a03: "ASPEED Technology, Inc.",
+    0x15ad: "VMware",
+    0x1234: "Bochs",
+    0x1af4: "Red Hat, Inc.",
+}
+# DMI values vendors leave in place of a real serial
+DMI_PLACEHOLDERS = {'', '0', 'NONE', 'DEFAULT STRING', 'TO BE FILLED BY O.E.M.', 'SYSTEM SERIAL NUMBER', 'NOT SPECIFIED'}
 
 def get_size(bytes, suffix="B"):
     """
@@ -29,251 +67,331 @@ def get_size(bytes, suffix="B"):
             return f"{bytes:.2f}{unit}{suffix}"
         bytes /= factor
 
-def get_system_info():
+def read_text(path, host=HOST):
+    """Stripped contents of a small text file, or None if it can't be read"""
+    return host.read_text(path)
+
+def linux_cpu_name(path=PROC_CPUINFO, host=HOST):
+    """CPU brand string from /proc/cpuinfo ("model name" on x86, "Hardware"/"Model" on ARM boards), or None"""
+    text = host.read_text(path)
+    if text is None:
+        return None
+    fields = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(':')
+        if sep:
+            fields.setdefault(key.strip().lower(), value.strip())
+        elif fields.get('model name'):
+            break # The first processor block is enough
+    for key in ('model name', 'hardware', 'model', 'cpu model', 'cpu'):
+        if fields.get(key):
+            return fields[key]
+    return None
+
+def linux_gpus(devices_dir=SYS_PCI_DEVICES, host=HOST):
     """
-    Scans the system for hardware info.
-    Returns a dict with:
-        - cpu_name
-        - cpu_cores
-        - cpu_threads
-        - cpu_clock_max (approx)
-        - ram_gb
-        - ram_type (best effort)
-        - drives: list of {device, mountpoint, fstype, opts, max_size_gb, type_guess}
-        - gpu_name
-        - os_name
-        - is_laptop
+    Display controllers (PCI class 0x03) from sysfs, named like lspci does,
+    e.g. "Intel Corporation HD Graphics 620".
+    Returns (names, all_named), all_named being False if pci.ids didn't know a device
+    or sysfs couldn't be read.
     """
-    info = {}
-    
-    # OS
-    info['os_name'] = platform.system() + " " + platform.release()
     try:
-        system = platform.system()
-        if system == "Windows":
-            try:
-                import winreg
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows NT\CurrentVersion")
-                try:
-                    display_version = winreg.QueryValueEx(key, "DisplayVersion")[0]
-                except FileNotFoundError:
-                    display_version = None
-                
-                try:
-                    release_id = winreg.QueryValueEx(key, "ReleaseId")[0]
-                except FileNotFoundError:
-                    release_id = None
-                    
-                try:
-                    product_name = winreg.QueryValueEx(key, "ProductName")[0]
-                except FileNotFoundError:
-                    product_name = f"Windows {platform.release()}"
+        entries = host.listdir(devices_dir)
+    except OSError:
+        return [], False
+    ids = []
+    for entry in entries:
+        device_dir = os.path.join(devices_dir, entry)
+        pci_class = host.read_text(os.path.join(device_dir, 'class'))
+        if not pci_class or not pci_class.lower().startswith('0x03'):
+            continue
+        try:
+            ids.append((int(host.read_text(os.path.join(device_dir, 'vendor')), 16),
+                        int(host.read_text(os.path.join(device_dir, 'device')), 16)))
+        except (TypeError, ValueError):
+            continue
+    names = {}
+    if ids:
+        for vendor, device, vendor_name, device_name in host.pci_names(ids):
+            names[vendor, device] = (vendor_name, device_name)
+    gpus = []
+    all_named = True
+    for vendor, device in ids:
+        vendor_name, device_name = names.get((vendor, device), (None, None))
+        if device_name is None:
+            all_named = False
+            vendor_name = vendor_name or PCI_GPU_VENDORS.get(vendor, f"Vendor {vendor:04x}")
+            device_name = f"Device {device:04x}"
+        gpus.append(f"{vendor_name} {device_name}")
+    return gpus, all_named
 
-                # Check for Windows 11 (Build >= 22000)
-                try:
-                    current_build = winreg.QueryValueEx(key, "CurrentBuild")[0]
-                    if int(current_build) >= 22000:
-                        product_name = product_name.replace("Windows 10", "Windows 11")
-                except:
-                    pass
-                
-                version = display_version if display_version else release_id
-                if version:
-                    info['os_name'] = f"{product_name} {version}"
-                else:
-                    info['os_name'] = product_name
+def linux_block_devices(sys_block=SYS_BLOCK, partitions=None, host=HOST):
+    """
+    One record per physical disk from sysfs: {device, mountpoint, capacity_gb, type, model}.
+    type is "NVMe" for nvme* devices, else "HDD" or "SSD" from queue/rotational.
+    Loop, zram, device-mapper and other virtual devices have no backing 'device' link and are
+    skipped, as are removable media (USB sticks, card readers, optical drives).
+    partitions: [{device, mountpoint}] as from host.disk_partitions(), read when not given.
+    Returns None if sysfs can't be read.
+    """
+    try:
+        names = host.listdir(sys_block)
+    except OSError:
+        return None
+    disks = {}
+    for name in names:
+        disk_dir = os.path.join(sys_block, name)
+        if not host.exists(os.path.join(disk_dir, 'device')) or name.startswith('sr'):
+            continue
+        if host.read_text(os.path.join(disk_dir, 'removable')) == '1':
+            continue
+        try:
+            # Always counted in 512-byte sectors, whatever the disk's block size
+            sectors = int(host.read_text(os.path.join(disk_dir, 'size')))
+        except (TypeError, ValueError):
+            continue
+        if sectors == 0:
+            continue
+        if name.startswith('nvme'):
+            drive_type = "NVMe"
+        elif host.read_text(os.path.join(disk_dir, 'queue', 'rotational')) == '1':
+            drive_type = "HDD"
+        else:
+            drive_type = "SSD"
+        disks[name] = {
+            "device": "/dev/" + name,
+            "mountpoint": "",
+            "capacity_gb": round(sectors * 512 / (1024**3), 2),
+            "type": drive_type,
+            "model": host.read_text(os.path.join(disk_dir, 'device', 'model')) or "",
+        }
+
+    # Only to show where each disk is used, no disk_usage() calls
+    if partitions is None:
+        try:
+            partitions = host.disk_partitions()
+        except Exception:
+            partitions = []
+    for partition in partitions:
+        part = os.path.basename(host.realpath(partition['device']))
+        disk = part if part in disks else os.path.basename(os.path.dirname(
+            host.realpath(os.path.join('/sys/class/block', part))))
+        if disk in disks:
+            mounts = disks[disk]["mountpoint"]
+            disks[disk]["mountpoint"] = f"{mounts}, {partition['mountpoint']}" if mounts else partition['mountpoint']
+    for disk in disks.values():
+        disk["mountpoint"] = disk["mountpoint"] or "Not mounted"
+    return list(disks.values())
+
+def read_dmi(field, dmi_dir=DMI_DIR, host=HOST):
+    """A DMI/SMBIOS field (product_serial, sys_vendor, product_name, ...), or None if unset or unreadable"""
+    value = host.read_text(os.path.join(dmi_dir, field))
+    if value is None or value.upper() in DMI_PLACEHOLDERS:
+        return None
+    return value
+
+def probe_os(host=HOST):
+    """Full OS name and version, e.g. "Windows 11 Pro 23H2" or "Ubuntu 22.04.3 LTS" """
+    system = host.system()
+    os_name = system + " " + host.release()
+    if system == "Windows":
+        try:
+            values = host.registry_values(r"SOFTWARE\Microsoft\Windows NT\CurrentVersion",
+                                          ["DisplayVersion", "ReleaseId", "ProductName", "CurrentBuild"])
+            display_version = values.get("DisplayVersion")
+            release_id = values.get("ReleaseId")
+            product_name = values.get("ProductName") or f"Windows {host.release()}"
+
+            # Check for Windows 11 (Build >= 22000)
+            try:
+                if int(values["CurrentBuild"]) >= 22000:
+                    product_name = product_name.replace("Windows 10", "Windows 11")
             except:
                 pass
-                
-        elif system == "Linux":
-            if os.path.exists("/etc/os-release"):
-                with open("/etc/os-release") as f:
-                    data = {}
-                    for line in f:
-                        if "=" in line:
-                            k,v = line.strip().split("=", 1)
-                            data[k] = v.strip('"')
-                    
-                    if "PRETTY_NAME" in data:
-                        info['os_name'] = data["PRETTY_NAME"]
-                    elif "NAME" in data and "VERSION" in data:
-                        info['os_name'] = f"{data['NAME']} {data['VERSION']}"
-        
-        elif system == "Darwin": # macOS
-            mac_ver = platform.mac_ver()[0]
-            if mac_ver:
-                info['os_name'] = f"macOS {mac_ver}"
+
+            version = display_version if display_version else release_id
+            if version:
+                os_name = f"{product_name} {version}"
             else:
-                info['os_name'] = "macOS (Unknown Version)"
-    except Exception as e:
-        print(f"OS Detection Error: {e}")
-    
-    # CPU
-    if cpuinfo:
-        cpu_data = cpuinfo.get_cpu_info()
-        info['cpu_name'] = cpu_data.get('brand_raw', platform.processor())
-    else:
-        info['cpu_name'] = platform.processor()
-    
-    info['cpu_cores'] = psutil.cpu_count(logical=False)
-    info['cpu_threads'] = psutil.cpu_count(logical=True)
-    
-    # RAM
-    svmem = psutil.virtual_memory()
-    import math
-    ram_gb_raw = svmem.total / (1024 ** 3)
+                os_name = product_name
+        except:
+            pass
+
+    elif system == "Linux":
+        os_release = host.read_text(OS_RELEASE)
+        if os_release is not None:
+            data = {}
+            for line in os_release.splitlines():
+                if "=" in line:
+                    k,v = line.strip().split("=", 1)
+                    data[k] = v.strip('"')
+
+            if "PRETTY_NAME" in data:
+                os_name = data["PRETTY_NAME"]
+            elif "NAME" in data and "VERSION" in data:
+                os_name = f"{data['NAME']} {data['VERSION']}"
+
+    elif system == "Darwin": # macOS
+        mac_ver = host.mac_version()
+        if mac_ver:
+            os_name = f"macOS {mac_ver}"
+        else:
+            os_name = "macOS (Unknown Version)"
+    return {'os_name': os_name}
+
+def probe_cpu(host=HOST):
+    """CPU brand string. py-cpuinfo is slow (it may spawn helper processes), so it's only the fallback on Linux."""
+    if host.system() == "Linux":
+        cpu_name = linux_cpu_name(host=host)
+        if cpu_name:
+            return {'cpu_name': cpu_name}
+    return {'cpu_name': host.cpu_brand() or host.processor()}
+
+def probe_cpu_count(host=HOST):
+    return {
+        'cpu_cores': host.cpu_count(False),
+        'cpu_threads': host.cpu_count(True),
+    }
+
+def probe_memory(host=HOST):
+    ram_gb_raw = host.memory_total() / (1024 ** 3)
     # Round up to nearest 2
-    info['ram_gb'] = math.ceil(ram_gb_raw / 2) * 2
-    
-    # RAM Type - Hard to get cross-platform without sudo/special tools like dmidecode or wmi
-    # Defaulting to DDR4 if unknown, or try WMI on Windows
-    info['ram_type'] = "Unknown (Assume DDR4)" 
-    if wmi:
+    return {'ram_gb': math.ceil(ram_gb_raw / 2) * 2}
+
+def probe_ram_type(host=HOST):
+    # RAM Type - from the SMBIOS memory devices on Linux (root only) or WMI on Windows
+    # Defaulting to DDR4 if unknown
+    ram_type = "Unknown (Assume DDR4)"
+    ram_modules = []
+    system = host.system()
+    if system == "Linux":
+        ram_modules = host.memory_devices() or []
+        ram_type = smbios.summarize_ram_type(ram_modules) or ram_type
+    elif system == "Windows":
         try:
-            c = wmi.WMI()
-            for mem in c.Win32_PhysicalMemory():
-                # SMBIOS Memory Type
-                # 20=DDR, 21=DDR2, 24=DDR3, 26=DDR4, 30=DDR5 (approx)
-                mtype = mem.SMBIOSMemoryType
-                if mtype == 24: info['ram_type'] = "DDR3"
-                elif mtype == 26: info['ram_type'] = "DDR4"
-                elif mtype >= 30: info['ram_type'] = "DDR5"
+            for mem in host.wmi_query('Win32_PhysicalMemory', ['SMBIOSMemoryType']):
+                # Same codes as the SMBIOS Type 17 Memory Type (24=DDR3, 26=DDR4, 34=DDR5)
+                mtype = mem['SMBIOSMemoryType']
+                if 'DDR' in smbios.memory_type_name(mtype):
+                    ram_type = smbios.memory_type_name(mtype)
                 elif mtype == 0: # Sometimes it is 0, check MemoryType?
                     pass
                 break # Just check one stick for now
         except:
             pass
+    return {'ram_type': ram_type, 'ram_modules': ram_modules}
+
+def probe_drives(host=HOST):
+    # Physical disks on Linux, instead of every mount (snap, overlay, bind...) of the same disk
+    if host.system() == "Linux":
+        drives = linux_block_devices(host=host)
+        if drives:
+            return {'drives': drives}
 
-    # Storage
     drives = []
-    partitions = psutil.disk_partitions()
+    partitions = host.disk_partitions()
     for partition in partitions:
         try:
-            partition_usage = psutil.disk_usage(partition.mountpoint)
+            total = host.disk_total(partition['mountpoint'])
         except PermissionError:
             continue
-        
+
         drive_type = "HDD/SSD" # psutil doesn't distinguish easily
         # On Windows, we can use WMI or PowerShell to check media type
-        
+
         drives.append({
-            "device": partition.device,
-            "mountpoint": partition.mountpoint,
-            "capacity_gb": round(partition_usage.total / (1024**3), 2),
-            "type": drive_type 
+            "device": partition['device'],
+            "mountpoint": partition['mountpoint'],
+            "capacity_gb": round(total / (1024**3), 2),
+            "type": drive_type
         })
-    info['drives'] = drives
+    return {'drives': drives}
+
+def probe_gpu(host=HOST):
+    gpu_list = []
+    system = host.system()
 
-    # Refine Drive Info on Windows
-    if wmi:
+    # Use WMI on Windows
+    if system == "Windows":
         try:
-            c = wmi.WMI()
-            # Win32_DiskDrive might give MediaType
-            for physical_disk in c.Win32_DiskDrive():
-                # Map physical disk to info if possible, or just gather general types
-                # Using MediaType often gives "Fixed hard disk media". 
-                # "Model" often contains "SSD"
-                pass
-            
-            # PowerShell is more reliable for MediaType: Get-PhysicalDisk | Select MediaType
-            # We can run that and parse output if we want to be fancy.
-            pass
+            for gpu in host.wmi_query('Win32_VideoController', ['Name']):
+                if gpu['Name']:
+                    gpu_list.append(gpu['Name'])
         except:
             pass
 
-    # GPU
-    # Use WMI on Windows
-    info['gpu_list'] = []
-    
-    if platform.system() == "Windows":
-        if wmi:
+        # Fallback/Additional check using PowerShell if WMI list is empty or for more details
+        if not gpu_list:
             try:
-                c = wmi.WMI()
-                for gpu in c.Win32_VideoController():
-                    if gpu.Name:
-                        info['gpu_list'].append(gpu.Name)
+                cmd = "Get-CimInstance Win32_VideoController | Select-Object -ExpandProperty Name"
+                returncode, stdout = host.run(["powershell", "-Command", cmd], 5)
+                if returncode == 0:
+                    names = [n.strip() for n in stdout.split('\n') if n.strip()]
+                    gpu_list.extend(names)
             except:
                 pass
-        
-        # Fallback/Additional check using PowerShell if WMI list is empty or for more details
-        if not info['gpu_list']:
+
+    elif system == "Linux":
+        gpu_list, all_named = linux_gpus(host=host)
+        # lspci is only worth running when sysfs is unreadable or pci.ids didn't name every GPU
+        if not all_named:
+            lspci_list = []
             try:
-                import subprocess
-                cmd = "Get-CimInstance Win32_VideoController | Select-Object -ExpandProperty Name"
-                result = subprocess.run(["powershell", "-Command", cmd], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    names = [n.strip() for n in result.stdout.split('\n') if n.strip()]
-                    info['gpu_list'].extend(names)
+                # Try lspci for GPU info
+                returncode, stdout = host.run(["lspci"], 2)
+                if returncode == 0:
+                    for line in stdout.split('\n'):
+                        if "VGA compatible controller" in line or "3D controller" in line or "Display controller" in line:
+                            # Extract the part after the colon
+                            parts = line.split(":", 2)
+                            if len(parts) > 2:
+                                lspci_list.append(parts[2].strip())
             except:
                 pass
-                
-    elif platform.system() == "Linux":
-        try:
-            import subprocess
-            # Try lspci for GPU info
-            result = subprocess.run(["lspci"], capture_output=True, text=True, timeout=2)
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if "VGA compatible controller" in line or "3D controller" in line:
-                        # Extract the part after the colon
-                        parts = line.split(":", 2)
-                        if len(parts) > 2:
-                            info['gpu_list'].append(parts[2].strip())
-        except:
-            pass
-            
-    elif platform.system() == "Darwin": # macOS
+            if lspci_list:
+                gpu_list = lspci_list
+
+    elif system == "Darwin": # macOS
         try:
-            import subprocess
-            result = subprocess.run(["system_profiler", "SPDisplaysDataType"], capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
+            returncode, stdout = host.run(["system_profiler", "SPDisplaysDataType"], 5)
+            if returncode == 0:
+                for line in stdout.split('\n'):
                     if "Chipset Model:" in line:
-                        info['gpu_list'].append(line.split(":", 1)[1].strip())
+                        gpu_list.append(line.split(":", 1)[1].strip())
         except:
             pass
 
     # Deduplicate
-    info['gpu_list'] = list(dict.fromkeys(info['gpu_list']))
-    
+    gpu_list = list(dict.fromkeys(gpu_list))
+
     # Default gpu_name to the first one found
-    if info['gpu_list']:
-        info['gpu_name'] = info['gpu_list'][0]
-    else:
-        info['gpu_name'] = "Unknown"
-    
+    return {'gpu_list': gpu_list, 'gpu_name': gpu_list[0] if gpu_list else "Unknown"}
+
+def probe_battery(host=HOST):
     # Laptop detection (Battery check)
-    battery = psutil.sensors_battery()
-    info['is_laptop'] = battery is not None
+    return {'is_laptop': host.battery_present()}
 
-    # Try to get serial number
+def probe_serial(host=HOST):
     serial_number = "Unknown"
     try:
-        if platform.system() == "Windows":
-            # Method 1: Try WMI library (preferred)
-            if wmi:
-                try:
-                    c = wmi.WMI()
-                    for bios in c.Win32_BIOS():
-                        if bios.SerialNumber and bios.SerialNumber.strip():
-                            serial_number = bios.SerialNumber.strip()
-                            break
-                except Exception as e:
-                    print(f"WMI method failed: {e}")
-            
+        system = host.system()
+        if system == "Windows":
+            # Method 1: WMI (preferred)
+            try:
+                for bios in host.wmi_query('Win32_BIOS', ['SerialNumber']):
+                    if bios['SerialNumber'] and bios['SerialNumber'].strip():
+                        serial_number = bios['SerialNumber'].strip()
+                        break
+            except Exception as e:
+                print(f"WMI method failed: {e}")
+
             # Method 2: PowerShell (Most reliable on modern Windows)
             if serial_number == "Unknown" or serial_number == "0":
                 try:
-                    import subprocess
                     cmd = "Get-CimInstance -ClassName Win32_BIOS | Select-Object -ExpandProperty SerialNumber"
-                    result = subprocess.run(
-                        ["powershell", "-Command", cmd],
-                        capture_output=True,
-                        text=True,
-                        timeout=3
-                    )
-                    if result.returncode == 0:
-                        sn = result.stdout.strip()
+                    returncode, stdout = host.run(["powershell", "-Command", cmd], 3)
+                    if returncode == 0:
+                        sn = stdout.strip()
                         if sn and sn.upper() not in ['SERIALNUMBER', 'TO BE FILLED BY O.E.M.', '0']:
                             serial_number = sn
                 except Exception as e:
@@ -282,15 +400,9 @@ def get_system_info():
             # Method 3: Fallback to wmic command (works without admin)
             if serial_number == "Unknown" or serial_number == "0":
                 try:
-                    import subprocess
-                    result = subprocess.run(
-                        ['wmic', 'bios', 'get', 'serialnumber'],
-                        capture_output=True,
-                        text=True,
-                        timeout=3
-                    )
-                    if result.returncode == 0:
-                        lines = [line.strip() for line in result.stdout.split('\n') if line.strip()]
+                    returncode, stdout = host.run(['wmic', 'bios', 'get', 'serialnumber'], 3)
+                    if returncode == 0:
+                        lines = [line.strip() for line in stdout.split('\n') if line.strip()]
                         # The first line is usually "SerialNumber", look for the value
                         if len(lines) > 1:
                             sn = lines[1]
@@ -298,24 +410,16 @@ def get_system_info():
                                 serial_number = sn
                 except Exception as e:
                     print(f"WMIC method failed: {e}")
-                    
-        elif platform.system() == "Linux":
-            try:
-                # Try dmidecode (requires root, may not work)
-                import subprocess
-                result = subprocess.run(['cat', '/sys/class/dmi/id/product_serial'], 
-                                      capture_output=True, text=True, timeout=1)
-                if result.returncode == 0 and result.stdout.strip():
-                    serial_number = result.stdout.strip()
-            except:
-                pass
-        elif platform.system() == "Darwin":  # macOS
+
+        elif system == "Linux":
+            # product_serial is readable by root only on most distributions. No dmidecode fallback:
+            # it needs root too, and reads the same DMI table.
+            serial_number = read_dmi('product_serial', host=host) or read_dmi('board_serial', host=host) or serial_number
+        elif system == "Darwin":  # macOS
             try:
-                import subprocess
-                result = subprocess.run(['system_profiler', 'SPHardwareDataType'], 
-                                      capture_output=True, text=True, timeout=2)
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
+                returncode, stdout = host.run(['system_profiler', 'SPHardwareDataType'], 2)
+                if returncode == 0:
+                    for line in stdout.split('\n'):
                         if 'Serial Number' in line:
                             serial_number = line.split(':')[-1].strip()
                             break
@@ -323,10 +427,267 @@ def get_system_info():
                 pass
     except Exception as e:
         print(f"Serial number detection error: {e}")
-    
-    info['serial_number'] = serial_number
-    
+
+    return {'serial_number': serial_number}
+
+# name, function(host), deadline in seconds, fields reported when the probe fails or runs out of time
+PROBES = [
+    ('os', probe_os, 2.0, {'os_name': platform.system() + " " + platform.release()}),
+    ('cpu', probe_cpu, 5.0, {'cpu_name': "Unknown"}),
+    ('cpu_count', probe_cpu_count, 1.0, {'cpu_cores': None, 'cpu_threads': None}),
+    ('memory', probe_memory, 1.0, {'ram_gb': 0}),
+    ('ram_type', probe_ram_type, 4.0, {'ram_type': "Unknown (Assume DDR4)", 'ram_modules': []}),
+    ('drives', probe_drives, 4.0, {'drives': []}),
+    ('gpu', probe_gpu, 6.0, {'gpu_list': [], 'gpu_name': "Unknown"}),
+    ('battery', probe_battery, 1.0, {'is_laptop': False}),
+    ('serial', probe_serial, 7.0, {'serial_number': "Unknown"}),
+]
+
+def _run_probe(func, host):
+    """Runs one probe on a pool thread. Returns (fields, seconds taken)."""
+    start = time.perf_counter()
+    host.probe_started()
+    try:
+        return func(host), time.perf_counter() - start
+    finally:
+        host.probe_finished()
+
+def iter_probes(budget=SCAN_BUDGET, probes=PROBES, host=None):
+    """
+    Runs every probe on its own thread and yields (probe name, fields, timing) as each one finishes.
+    A probe that fails, or is still running at its deadline (or when `budget` seconds have passed),
+    yields its fallback fields instead ("Unknown"), so one hung tool never holds up the rest of the scan.
+    timing is {'status': 'ok' | 'timeout' | 'error', 'seconds'}
+    host: the machine to probe (default: this one), see probe_host
+    """
+    host = host or HOST
+    start = time.perf_counter()
+    scan_deadline = start + budget
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix='probe')
+    try:
+        pending = {pool.submit(_run_probe, func, host): (name, min(start + timeout, scan_deadline), defaults)
+                   for name, func, timeout, defaults in probes}
+        while pending:
+            next_deadline = min(deadline for _, deadline, _ in pending.values())
+            done, _ = concurrent.futures.wait(pending, timeout=max(0.0, next_deadline - time.perf_counter()),
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name, _, defaults = pending.pop(future)
+                try:
+                    fields, seconds = future.result()
+                    yield name, fields, {'status': 'ok', 'seconds': round(seconds, 3)}
+                except Exception as e:
+                    print(f"Scan probe '{name}' failed: {e}")
+                    yield name, dict(defaults), {'status': 'error', 'seconds': round(time.perf_counter() - start, 3)}
+            now = time.perf_counter()
+            for future, (name, deadline, defaults) in list(pending.items()):
+                if deadline <= now and not future.done():
+                    del pending[future]
+                    print(f"Scan probe '{name}' timed out, using defaults")
+                    yield name, dict(defaults), {'status': 'timeout', 'seconds': round(now - start, 3)}
+    finally:
+        # Don't wait for probes that timed out, their threads finish (or hit their own subprocess timeouts) on their own
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def get_system_info(budget=SCAN_BUDGET, probes=PROBES, host=None):
+    """
+    Scans the system for hardware info.
+    Returns a dict with:
+        - cpu_name
+        - cpu_cores
+        - cpu_threads
+        - ram_gb
+        - ram_type (best effort)
+        - ram_modules: installed DIMMs from SMBIOS on Linux, see smbios.memory_devices
+        - drives: list of {device, mountpoint, capacity_gb, type}, one per physical disk on Linux
+        - gpu_list, gpu_name
+        - os_name
+        - is_laptop
+        - serial_number
+        - probe_timings: {probe name: {'status': 'ok' | 'timeout' | 'error', 'seconds'}}
+    The probes run in parallel, see iter_probes.
+    """
+    info = {}
+    timings = {}
+    for name, fields, timing in iter_probes(budget, probes, host):
+        info.update(fields)
+        timings[name] = timing
+    info['probe_timings'] = timings
+    return info
+
+def boot_id():
+    """Identifier that changes on every boot: the kernel boot_id on Linux, the boot time elsewhere"""
+    value = read_text(BOOT_ID_PATH)
+    if value:
+        return value
+    try:
+        return str(int(psutil.boot_time()))
+    except Exception:
+        return None
+
+def machine_serial():
+    """
+    Cheap machine identity for the scan cache: the DMI serial or UUID when readable,
+    else the OS install ID (machine-id / MachineGuid), else the host name.
+    Unlike probe_serial this never spawns a process.
+    """
+    if platform.system() == "Linux":
+        serial = read_dmi('product_serial') or read_dmi('product_uuid') or read_text(MACHINE_ID_PATH)
+        if serial:
+            return serial
+    elif platform.system() == "Windows":
+        try:
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography")
+            return winreg.QueryValueEx(key, "MachineGuid")[0]
+        except Exception:
+            pass
+    return platform.node()
+
+def scan_cache_key():
+    boot = boot_id()
+    return None if boot is None else f"{boot}:{machine_serial()}"
+
+# In-memory copy of the last scan: {'key', 'scanned_at', 'info'}
+_scan_cache = None
+_scan_lock = threading.Lock()
+_refresh_thread = None
+
+def _owned_by_me(st):
+    """True if a stat result belongs to this process's user (always on Windows, where st_uid is 0)"""
+    return os.name == 'nt' or st.st_uid == os.geteuid()
+
+def _private_dir(directory):
+    """Creates directory (0700) if needed. False if it is a link, or anyone but this user can get in."""
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError as e:
+        print(f"Could not create scan cache directory: {e}")
+        return False
+    return stat.S_ISDIR(st.st_mode) and _owned_by_me(st) and (os.name == 'nt' or not st.st_mode & 0o077)
+
+def _load_scan_cache(key, path):
+    # Never follow a link, and ignore files some other user put there
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd, encoding='utf-8') as f:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode) or not _owned_by_me(st):
+                return None
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if isinstance(entry, dict) and entry.get('key') == key else None
+
+def _save_scan_cache(entry, path):
+    directory = os.path.dirname(path) or '.'
+    if not _private_dir(directory):
+        print(f"Not saving the scan cache: {directory} is not private to this user")
+        return
+    # Write a new private file then rename it, so a concurrent reader never sees half a file
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix='.scan_cache-', suffix='.tmp', dir=directory)
+    except OSError as e:
+        print(f"Could not save scan cache: {e}")
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not save scan cache: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def _store_scan(key, info, path):
+    entry = {'key': key, 'scanned_at': datetime.datetime.now().isoformat(timespec='seconds'), 'info': info}
+    # A scan where a probe timed out or failed is used once but not kept (in memory or on disk),
+    # so the next scan retries it
+    if key is not None and all(t['status'] == 'ok' for t in info['probe_timings'].values()):
+        global _scan_cache
+        with _scan_lock:
+            _scan_cache = entry
+        _save_scan_cache(entry, path)
+    return entry
+
+def _scan_and_store(key, path):
+    return _store_scan(key, get_system_info(), path)
+
+def _cached_scan(key, path):
+    """The cache entry for key, from memory or disk, or None"""
+    global _scan_cache
+    if key is None:
+        return None
+    with _scan_lock:
+        if _scan_cache and _scan_cache['key'] == key:
+            return _scan_cache
+    entry = _load_scan_cache(key, path)
+    if entry is not None:
+        with _scan_lock:
+            _scan_cache = entry
+    return entry
+
+def _cached_info(entry, hit, refreshing=False):
+    info = copy.deepcopy(entry['info'])
+    info['scan_cache'] = {'hit': hit, 'scanned_at': entry['scanned_at'], 'refreshing': refreshing}
     return info
 
+def refresh_scan_cache(path=SCAN_CACHE_PATH):
+    """Rescans in a background thread and updates the cache, unless a refresh is already running"""
+    global _refresh_thread
+    with _scan_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        _refresh_thread = threading.Thread(target=_scan_and_store, args=(scan_cache_key(), path),
+                                           name='scan-refresh', daemon=True)
+        _refresh_thread.start()
+
+def get_cached_system_info(force=False, refresh=False, path=SCAN_CACHE_PATH):
+    """
+    get_system_info, reusing the last scan from this boot of this machine (in memory, then on disk).
+    Hardware doesn't change while the machine runs, so only the first scan after a boot probes anything.
+    force: always rescan (and replace the cache)
+    refresh: return the cached scan right away and rescan in the background for the next call
+    The returned dict is a copy, plus 'scan_cache': {'hit', 'scanned_at', 'refreshing'}.
+    """
+    key = scan_cache_key()
+    entry = None if force else _cached_scan(key, path)
+    if entry is not None:
+        if refresh:
+            refresh_scan_cache(path)
+        return _cached_info(entry, True, refreshing=refresh)
+    return _cached_info(_scan_and_store(key, path), False)
+
+def iter_cached_system_info(force=False, path=SCAN_CACHE_PATH, probes=PROBES):
+    """
+    Streaming get_cached_system_info: yields (probe name, fields, timing) as each probe finishes
+    (all at once from the cache), then (None, info, None) with the complete dict.
+    """
+    key = scan_cache_key()
+    entry = None if force else _cached_scan(key, path)
+    if entry is not None:
+        info = _cached_info(entry, True)
+        timings = info.get('probe_timings', {})
+        for name, _, _, defaults in probes:
+            yield name, {field: info.get(field, value) for field, value in defaults.items()}, timings.get(name)
+        yield None, info, None
+        return
+
+    info = {}
+    timings = {}
+    for name, fields, timing in iter_probes(probes=probes):
+        info.update(fields)
+        timings[name] = timing
+        yield name, fields, timing
+    info['probe_timings'] = timings
+    yield None, _cached_info(_store_scan(key, info, path), False), None
+
 if __name__ == "__main__":
     print(json.dumps(get_system_info(), indent=4))
@@ -0,0 +1,160 @@
+"""
+Minimal SMBIOS reader: memory devices (Type 17) straight from the firmware tables.
+
+Linux exposes the raw table at /sys/firmware/dmi/tables/DMI (readable by root). It is read
+once and walked through a memoryview, so structures and strings are sliced without copies;
+only the strings a memory device refers to are decoded.
+
+    python smbios.py                                # this machine (as root)
+    python smbios.py fixtures/smbios/desktop_ddr3.bin
+"""
+import functools
+import json
+import struct
+import sys
+
+DMI_TABLE_PATH = '/sys/firmware/dmi/tables/DMI'
+
+TYPE_MEMORY_DEVICE = 17
+TYPE_END_OF_TABLE = 127
+
+# Memory Type byte (SMBIOS 3.x, 7.18.2). Win32_PhysicalMemory.SMBIOSMemoryType uses the same values.
+MEMORY_TYPES = {
+    0x01: "Other", 0x02: "Unknown", 0x03: "DRAM", 0x04: "EDRAM", 0x05: "VRAM", 0x06: "SRAM", 0x07: "RAM",
+    0x08: "ROM", 0x09: "FLASH", 0x0A: "EEPROM", 0x0B: "FEPROM", 0x0C: "EPROM", 0x0D: "CDRAM", 0x0E: "3DRAM",
+    0x0F: "SDRAM", 0x10: "SGRAM", 0x11: "RDRAM", 0x12: "DDR", 0x13: "DDR2", 0x14: "DDR2 FB-DIMM",
+    0x18: "DDR3", 0x19: "FBD2", 0x1A: "DDR4", 0x1B: "LPDDR", 0x1C: "LPDDR2", 0x1D: "LPDDR3", 0x1E: "LPDDR4",
+    0x1F: "Logical non-volatile device", 0x20: "HBM", 0x21: "HBM2", 0x22: "DDR5", 0x23: "LPDDR5", 0x24: "HBM3",
+}
+
+FORM_FACTORS = {
+    0x01: "Other", 0x02: "Unknown", 0x03: "SIMM", 0x04: "SIP", 0x05: "Chip", 0x06: "DIP", 0x07: "ZIP",
+    0x08: "Proprietary Card", 0x09: "DIMM", 0x0A: "TSOP", 0x0B: "Row of chips", 0x0C: "RIMM",
+    0x0D: "SODIMM", 0x0E: "SRIMM", 0x0F: "FB-DIMM", 0x10: "Die",
+}
+
+# Strings firmware leaves in unused fields
+_PLACEHOLDERS = {'', 'not specified', 'unknown', 'none', 'no dimm', 'empty', 'to be filled by o.e.m.'}
+
+def memory_type_name(code):
+    return MEMORY_TYPES.get(code, "Unknown")
+
+def iter_structures(table):
+    """
+    Yields (type, formatted area, strings area) memoryviews for each structure in a raw SMBIOS table.
+    Stops at the end-of-table structure or at the first truncated one.
+    """
+    data = bytes(table)
+    view = memoryview(data)
+    offset = 0
+    end = len(data)
+    while offset + 4 <= end:
+        struct_type, length = view[offset], view[offset + 1]
+        if length < 4 or offset + length > end:
+            return
+        # Strings follow the formatted area and end with a double NUL (just the double NUL if there are none)
+        strings_end = data.find(b'\0\0', offset + length)
+        if strings_end < 0:
+            return
+        yield struct_type, view[offset:offset + length], view[offset + length:strings_end]
+        if struct_type == TYPE_END_OF_TABLE:
+            return
+        offset = strings_end + 2
+
+def _string(strings, index):
+    """String number index (1-based) of a structure, '' for 0 or a placeholder"""
+    if index == 0 or not strings:
+        return ''
+    parts = strings.tobytes().split(b'\0')
+    if index > len(parts):
+        return ''
+    value = parts[index - 1].decode('ascii', errors='replace').strip()
+    return '' if value.lower() in _PLACEHOLDERS else value
+
+def _word(area, offset):
+    return struct.unpack_from('<H', area, offset)[0] if len(area) >= offset + 2 else None
+
+def _dword(area, offset):
+    return struct.unpack_from('<I', area, offset)[0] if len(area) >= offset + 4 else None
+
+def parse_memory_device(area, strings):
+    """
+    Decodes one Type 17 structure. Returns a dict, or None for an empty slot.
+        locator, bank, size_mb, type, type_code, form_factor, speed_mts, configured_speed_mts,
+        manufacturer, part_number
+    Fields the structure's SMBIOS version doesn't have are None.
+    """
+    size = _word(area, 0x0C)
+    if not size:
+        return None
+    if size == 0x7FFF:
+        # 32 GB or more: the real size is in Extended Size, in MB (SMBIOS 2.7+)
+        size_mb = (_dword(area, 0x1C) or 0) & 0x7FFFFFFF
+    elif size == 0xFFFF:
+        size_mb = None
+    elif size & 0x8000:
+        size_mb = -(-(size & 0x7FFF) // 1024) # Given in KB, rounded up
+    else:
+        size_mb = size
+    if size_mb == 0:
+        return None
+
+    def speed(offset, extended_offset):
+        # 0xFFFF means the speed is in the Extended Speed DWORD (SMBIOS 3.3+)
+        value = _word(area, offset)
+        if value == 0xFFFF:
+            value = _dword(area, extended_offset)
+        return value or None
+
+    type_code = area[0x12] if len(area) > 0x12 else 0
+    return {
+        'locator': _string(strings, area[0x10]) if len(area) > 0x10 else '',
+        'bank': _string(strings, area[0x11]) if len(area) > 0x11 else '',
+        'size_mb': size_mb,
+        'type': memory_type_name(type_code),
+        'type_code': type_code,
+        'form_factor': FORM_FACTORS.get(area[0x0E], "Unknown") if len(area) > 0x0E else "Unknown",
+        'speed_mts': speed(0x15, 0x54),
+        'configured_speed_mts': speed(0x20, 0x58),
+        'manufacturer': _string(strings, area[0x17]) if len(area) > 0x17 else '',
+        'part_number': _string(strings, area[0x1A]) if len(area) > 0x1A else '',
+    }
+
+def memory_devices(table):
+    """Installed memory modules (Type 17, empty slots left out) in a raw SMBIOS table"""
+    modules = []
+    for struct_type, area, strings in iter_structures(table):
+        if struct_type == TYPE_MEMORY_DEVICE:
+            module = parse_memory_device(area, strings)
+            if module is not None:
+                modules.append(module)
+    return modules
+
+@functools.lru_cache(maxsize=None)
+def read_memory_devices(path=DMI_TABLE_PATH):
+    """
+    Installed memory modules of this machine, or None if the table can't be read (not Linux, not root).
+    Read and parsed once per process: modules don't change while it runs.
+    """
+    try:
+        with open(path, 'rb') as f:
+            table = f.read()
+    except OSError:
+        return None
+    return tuple(memory_devices(table))
+
+def summarize_ram_type(modules):
+    """The memory type most modules report, e.g. "DDR4", or None if none of them say"""
+    counts = {}
+    for module in modules:
+        if module['type'] not in ("Unknown", "Other"):
+            counts[module['type']] = counts.get(module['type'], 0) + 1
+    return max(counts, key=counts.get) if counts else None
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DMI_TABLE_PATH
+    modules = read_memory_devices(path)
+    if modules is None:
+        print(f"Could not read {path} (root is needed for the live table)")
+        sys.exit(1)
+    print(json.dumps(list(modules), indent=4))
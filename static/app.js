@@ -4,9 +4,74 @@ let currentPricing = null;
 let cpuCandidates = [];
 let softwareList = ["VLC Media Player", "Google Chrome", "Mozilla Firefox", "LibreOffice"];
 let cpuMode = 'auto'; // 'auto' or 'custom'
+let autocompleteTimer = null;
+let autocompleteController = null;
+let cpuSuggestions = [];
+
+// Scan hardware (the server reuses the scan from this boot unless force is set).
+// Results stream in over Server-Sent Events, so each part of the form fills in as soon as its probe is done.
+function scanHardware(force = false) {
+    if (!window.EventSource) {
+        scanHardwareOnce(force);
+        return;
+    }
+    showLoading(true);
+
+    currentSpecs = {};
+    currentPricing = null;
+    cpuCandidates = [];
+    let formShown = false;
+    const showForm = () => {
+        if (formShown) return;
+        formShown = true;
+        renderSoftwareList();
+        showLoading(false);
+    };
+
+    const source = new EventSource('/api/scan-stream' + (force ? '?force=1' : ''));
+
+    source.addEventListener('probe', (event) => {
+        const data = JSON.parse(event.data);
+        Object.assign(currentSpecs, data.fields);
+        const populate = PROBE_SECTIONS[data.probe];
+        if (populate) populate();
+        showForm();
+    });
+
+    source.addEventListener('cpu_candidates', (event) => {
+        cpuCandidates = JSON.parse(event.data).cpu_candidates || [];
+        populateCpuSelect();
+    });
+
+    source.addEventListener('result', (event) => {
+        const data = JSON.parse(event.data);
+        if (data.success) {
+            currentSpecs = data.specs;
+            currentPricing = data.pricing;
+            cpuCandidates = data.cpu_candidates || [];
+            populateCpuSelect();
+            showForm();
+            // Force a recalculation to ensure backend pricing matches frontend defaults (e.g. SSD selection)
+            recalculatePrice();
+            updateFieldVisibility();
+        } else {
+            alert('Error scanning hardware: ' + data.error);
+            showLoading(false);
+        }
+    });
+
+    // Closing here also stops EventSource from reconnecting and scanning again
+    source.addEventListener('done', () => source.close());
+
+    source.onerror = () => {
+        source.close();
+        // Nothing arrived, so streaming isn't available: scan in one request instead
+        if (!formShown) scanHardwareOnce(force);
+    };
+}
 
-// Scan hardware
-async function scanHardware() {
+// Scan hardware in a single request
+async function scanHardwareOnce(force = false) {
     try {
         showLoading(true);
 
@@ -14,7 +79,8 @@ async function scanHardware() {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
-            }
+            },
+            body: JSON.stringify({ force: force })
         });
 
         const data = await response.json();
@@ -42,6 +108,34 @@ async function scanHardware() {
 function populateForm() {
     if (!currentSpecs) return;
 
+    populateCpuSelect();
+    populateCpuInfo();
+    populateRam();
+    populateGpu();
+    populateOs();
+    populateDeviceType();
+    populateStorage();
+
+    // Render Software List
+    renderSoftwareList();
+
+    populateSerial();
+}
+
+// Form sections to refresh when a scan probe reports in
+const PROBE_SECTIONS = {
+    os: populateOs,
+    cpu: populateCpuInfo,
+    cpu_count: populateCpuInfo,
+    memory: populateRam,
+    ram_type: populateRam,
+    drives: populateStorage,
+    gpu: populateGpu,
+    battery: populateDeviceType,
+    serial: populateSerial
+};
+
+function populateCpuSelect() {
     // CPU Info
     const cpuSelect = document.getElementById('cpu_model_select');
     cpuSelect.innerHTML = '';
@@ -65,10 +159,14 @@ function populateForm() {
         option.text = "No exact matches found";
         cpuSelect.appendChild(option);
     }
+}
 
+function populateCpuInfo() {
     document.getElementById('detected_cpu_name').textContent = currentSpecs.cpu_name || 'Unknown';
     document.getElementById('cpu_cores').value = `${currentSpecs.cpu_cores || '?'} / ${currentSpecs.cpu_threads || '?'}`;
+}
 
+function populateRam() {
     // RAM Info
     document.getElementById('ram_gb').value = currentSpecs.ram_gb || 0;
 
@@ -81,7 +179,9 @@ function populateForm() {
     } else if (ramType.includes('DDR5')) {
         document.getElementById('ram_type').value = 'DDR5';
     }
+}
 
+function populateGpu() {
     // GPU Info - populate dropdown and name field
     const gpuSelect = document.getElementById('gpu_model_select');
     gpuSelect.innerHTML = '';
@@ -126,13 +226,35 @@ function populateForm() {
     }
 
     document.getElementById('gpu_price').value = currentSpecs.gpu_price || 0;
+}
 
+function populateOs() {
     // OS Info
     document.getElementById('os_name').value = currentSpecs.os_name || 'Unknown';
+}
 
+function populateDeviceType() {
     // Device Type
     document.getElementById('device_type').value = currentSpecs.is_laptop ? 'Laptop' : 'Desktop';
 
+    // Auto-detect features
+    // WiFi - most modern systems have WiFi
+    document.getElementById('feature_wifi').checked = true;
+
+    // Bluetooth - common on laptops, less on desktops
+    document.getElementById('feature_bluetooth').checked = currentSpecs.is_laptop;
+
+    // Webcam - common on laptops
+    document.getElementById('feature_webcam').checked = currentSpecs.is_laptop;
+
+    // Sound and Microphone - common on laptops
+    document.getElementById('feature_sound').checked = currentSpecs.is_laptop;
+    document.getElementById('feature_microphone').checked = currentSpecs.is_laptop;
+
+    updateFieldVisibility();
+}
+
+function populateStorage() {
     // Storage Devices - Create editable controls
     const storageList = document.getElementById('storage_list');
     storageList.innerHTML = '';
@@ -148,7 +270,7 @@ function populateForm() {
                 <input type="checkbox" class="storage-drive-checkbox" id="drive_${index}" checked onchange="recalculatePrice()">
                 <div class="storage-drive-info" style="flex-grow: 1;">
                     <div style="display: flex; gap: 10px; align-items: center; margin-bottom: 5px;">
-                         <strong>${drive.device}</strong>
+                         <strong>${drive.device}</strong>${drive.model ? ` <small>${drive.model}</small>` : ''}
                          <select class="storage-drive-type" id="drive_type_${index}" onchange="recalculatePrice()" style="padding: 2px;">
                             <option value="HDD" ${drive.type.toLowerCase().includes('hdd') ? 'selected' : ''}>HDD</option>
                             <option value="SSD" ${drive.type.toLowerCase().includes('ssd') ? 'selected' : ''}>SSD</option>
@@ -166,24 +288,9 @@ function populateForm() {
     } else {
         storageList.innerHTML = '<p>No storage devices detected</p>';
     }
+}
 
-    // Render Software List
-    renderSoftwareList();
-
-    // Auto-detect features
-    // WiFi - most modern systems have WiFi
-    document.getElementById('feature_wifi').checked = true;
-
-    // Bluetooth - common on laptops, less on desktops
-    document.getElementById('feature_bluetooth').checked = currentSpecs.is_laptop;
-
-    // Webcam - common on laptops
-    document.getElementById('feature_webcam').checked = currentSpecs.is_laptop;
-
-    // Sound and Microphone - common on laptops
-    document.getElementById('feature_sound').checked = currentSpecs.is_laptop;
-    document.getElementById('feature_microphone').checked = currentSpecs.is_laptop;
-
+function populateSerial() {
     // Serial Number
     if (currentSpecs.serial_number && currentSpecs.serial_number !== 'Unknown') {
         document.getElementById('serial_number').value = currentSpecs.serial_number;
@@ -242,6 +349,58 @@ async function searchCpu() {
     }
 }
 
+// Search-as-you-type: suggest catalog CPUs while the user types
+const AUTOCOMPLETE_DELAY_MS = 150;
+
+function onCpuSearchInput() {
+    const query = document.getElementById('cpu_search_input').value.trim();
+
+    // Picking a suggestion fills in the full name: search it right away
+    if (cpuSuggestions.includes(query)) {
+        clearTimeout(autocompleteTimer);
+        searchCpu();
+        return;
+    }
+
+    // Wait for a pause in typing instead of querying on every keystroke
+    clearTimeout(autocompleteTimer);
+    autocompleteTimer = setTimeout(() => fetchCpuSuggestions(query), AUTOCOMPLETE_DELAY_MS);
+}
+
+async function fetchCpuSuggestions(query) {
+    // Only the latest query matters, drop the one still in flight
+    if (autocompleteController) autocompleteController.abort();
+    if (query.length < 2) {
+        showCpuSuggestions([]);
+        return;
+    }
+
+    const controller = new AbortController();
+    autocompleteController = controller;
+    try {
+        const response = await fetch(`/api/cpu-autocomplete?q=${encodeURIComponent(query)}&limit=10`, {
+            signal: controller.signal
+        });
+        const data = await response.json();
+        if (data.success) showCpuSuggestions(data.completions);
+    } catch (e) {
+        if (e.name !== 'AbortError') console.error("Autocomplete error", e);
+    } finally {
+        if (autocompleteController === controller) autocompleteController = null;
+    }
+}
+
+function showCpuSuggestions(completions) {
+    cpuSuggestions = completions.map(cpu => cpu.name);
+    const list = document.getElementById('cpu_suggestions');
+    list.innerHTML = '';
+    completions.forEach(cpu => {
+        const option = document.createElement('option');
+        option.value = cpu.name;
+        option.label = `Passmark: ${cpu.passmark}`;
+        list.appendChild(option);
+    });
+}
 
 // Update field visibility based on device type
 function updateFieldVisibility() {
@@ -433,7 +592,7 @@ async function recalculatePrice() {
 // Rescan hardware
 function rescanHardware() {
     if (confirm('This will rescan your hardware and reset all custom values. Continue?')) {
-        scanHardware();
+        scanHardware(true);
     }
 }
 
@@ -444,6 +603,7 @@ async function generatePDF() {
         return;
     }
 
+    let pdfWindow = null;
     try {
         // Gather all form data
         const data = {
@@ -547,6 +707,9 @@ async function generatePDF() {
         button.textContent = '⏳ Generating PDF...';
         button.disabled = true;
 
+        // Opened now, while the click still counts as a user action, so popup blockers let it through
+        pdfWindow = window.open('', '_blank');
+
         const response = await fetch('/api/generate-pdf', {
             method: 'POST',
             headers: {
@@ -555,11 +718,11 @@ async function generatePDF() {
             body: JSON.stringify(data)
         });
 
-        const result = await response.json();
-
-        if (result.success) {
-            alert('PDF generated successfully! The file should open automatically.');
+        if (response.ok) {
+            showPdf(await response.blob(), pdfFilename(response), pdfWindow);
         } else {
+            if (pdfWindow) pdfWindow.close();
+            const result = await response.json();
             alert('Error generating PDF: ' + result.error);
         }
 
@@ -568,6 +731,7 @@ async function generatePDF() {
         button.disabled = false;
 
     } catch (error) {
+        if (pdfWindow) pdfWindow.close();
         alert('Error generating PDF: ' + error.message);
         // Restore button
         event.target.textContent = '📄 Generate PDF Report';
@@ -575,6 +739,30 @@ async function generatePDF() {
     }
 }
 
+// File name the server gave a build sheet, from its Content-Disposition header
+function pdfFilename(response) {
+    const disposition = response.headers.get('Content-Disposition') || '';
+    const match = disposition.match(/filename="?([^";]+)"?/);
+    return match ? match[1] : 'BuildSheet.pdf';
+}
+
+// Shows a generated PDF in the window opened for it, or downloads it if that window was blocked
+function showPdf(blob, filename, pdfWindow) {
+    const url = URL.createObjectURL(blob);
+    if (pdfWindow && !pdfWindow.closed) {
+        pdfWindow.location.href = url;
+    } else {
+        const link = document.createElement('a');
+        link.href = url;
+        link.download = filename;
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+    }
+    // The viewer has loaded it by then
+    setTimeout(() => URL.revokeObjectURL(url), 60000);
+}
+
 // Show/hide loading
 function showLoading(show) {
     document.getElementById('loading').style.display = show ? 'block' : 'none';
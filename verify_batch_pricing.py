@@ -0,0 +1,53 @@
+import contextlib
+import io
+import random
+
+import pricing
+from catalog import get_catalog
+
+# calculate_prices_batch must give exactly what calculate_price gives for each spec
+SPEC_COUNT = 2000
+rng = random.Random(2024)
+
+catalog = get_catalog('cpus.db')
+cpu_names = [catalog.records[pos].name for pos in rng.sample(range(len(catalog.records)), 300)]
+unknown_cpus = ["Mystery CPU 9000", "Unknown", "", "Intel Core i7-99999Z"]
+ram_types = ['DDR3', 'DDR4', 'DDR5', 'ddr4', 'DDR2', 'Unknown (Assume DDR4)', '']
+drive_types = ['HDD', 'SSD', 'NVMe', 'nvme', 'Unknown']
+os_names = ['Windows 10 Pro', 'Windows 11 Home', 'Linux Mint 21.2', 'Ubuntu 22.04', 'macOS 14.4', 'ChromeOS', '']
+
+def random_specs():
+    specs = {
+        'cpu_name': rng.choice(cpu_names) if rng.random() < 0.85 else rng.choice(unknown_cpus),
+        'ram_gb': rng.choice([0, 2, 4, 6, 8, 12, 16, 24, 32, 64]),
+        'ram_type': rng.choice(ram_types),
+        'drives': [{'capacity_gb': rng.choice([120, 250.06, 500, 931.51, 2000]), 'type': rng.choice(drive_types)}
+                   for _ in range(rng.choice([0, 1, 1, 2, 3, 4]))],
+        'gpu_price': rng.choice([0.0, 0.0, 25.0, 80.5]),
+        'os_name': rng.choice(os_names),
+        'is_laptop': rng.random() < 0.5,
+    }
+    # Sometimes the CPU was picked by hand (possibly one the catalog doesn't know)
+    if rng.random() < 0.3:
+        specs['cpu_model_name'] = rng.choice(cpu_names + unknown_cpus)
+    return specs
+
+specs_list = [random_specs() for _ in range(SPEC_COUNT)]
+manual_passmarks = [rng.choice([None, None, None, 1500, 8000.5, 25000]) for _ in specs_list]
+
+# Pricing prints "CPU not found" warnings for the unknown CPUs
+with contextlib.redirect_stdout(io.StringIO()):
+    batch = pricing.calculate_prices_batch([dict(s) for s in specs_list], manual_passmarks=manual_passmarks)
+    scalar = [pricing.calculate_price(dict(s), manual_passmark=mp) for s, mp in zip(specs_list, manual_passmarks)]
+
+print(f"Comparing {SPEC_COUNT} specs (NumPy batch path: {pricing.np is not None})")
+mismatches = [(specs, mp, b, s) for specs, mp, b, s in zip(specs_list, manual_passmarks, batch, scalar) if b != s]
+for specs, mp, b, s in mismatches[:5]:
+    print(f"MISMATCH for {specs} (manual passmark {mp}):")
+    print(f"  batch  {b}")
+    print(f"  scalar {s}")
+
+if len(batch) != len(scalar) or mismatches:
+    print(f"\nFAILURE: {len(mismatches)} of {SPEC_COUNT} batch prices differ from calculate_price")
+    raise SystemExit(1)
+print(f"\nSUCCESS: all {SPEC_COUNT} batch prices match calculate_price")
@@ -0,0 +1,50 @@
+import pricing
+from catalog import clean_cpu_name, get_catalog
+
+# The top CPU candidate must not depend on how many candidates are kept: within the
+# "starts with" (90) and "contains" (80) tiers it is the first match in catalog order,
+# the same CPU a full scan of the catalog picks.
+catalog = get_catalog('cpus.db')
+names = [record.name.lower() for record in catalog.records]
+
+def full_scan_top(query):
+    text = clean_cpu_name(query).lower()
+    for match in (str.startswith, str.__contains__):
+        for name in names:
+            if match(name, text):
+                return name
+    return None
+
+queries = ["Apple M1", "Apple M2", "Apple M3", "Intel", "Ryzen", "AMD Ryzen 7", "Xeon", "Celeron",
+           "Intel Core i5", "Pentium", "Athlon", "Snapdragon", "Core 2 Duo", "EPYC"]
+failures = 0
+for query in queries:
+    candidates = pricing.get_cpu_candidates(query)
+    top = candidates[0] if candidates else None
+    if top is None or top['score'] not in (90, 80):
+        print(f"SKIP {query!r}: top score {top and top['score']}")
+        continue
+    expected = full_scan_top(query)
+    ok = top['name'].lower() == expected
+    failures += not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {query!r} -> {top['name']!r}" + ('' if ok else f" (expected {expected!r})"))
+
+# Reported regressions: the base Apple chips, not the Ultra
+for query, expected in [("Apple M1", "Apple M1 8 Core 3200 MHz"), ("Apple M2", "Apple M2 8 Core 3500 MHz")]:
+    top = pricing.get_cpu_candidates(query)[0]['name']
+    ok = top == expected
+    failures += not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {query!r} -> {top!r}" + ('' if ok else f" (expected {expected!r})"))
+
+# Typo matches fix misspelled words, never model numbers, and aren't added to an exact hit
+for query, expected in [("Xoen E5-2670", "Intel Xeon E5-2670 @ 2.60GHz"), ("Rayzen 5 3600", "AMD Ryzen 5 3600"),
+                        ("i7-920", None), ("Pentium G4560", None), ("xyz", None), ("i7-7600X", None)]:
+    typos = [c['name'] for c in pricing.get_cpu_candidates(query) if c['score'] == 50]
+    ok = typos[:1] == ([expected] if expected else [])
+    failures += not ok
+    print(f"{'OK  ' if ok else 'FAIL'} typo {query!r} -> {typos[:3]!r}")
+
+if failures:
+    print(f"\nFAILURE: {failures} candidate checks failed")
+    raise SystemExit(1)
+print("\nSUCCESS: all candidate checks passed")
@@ -0,0 +1,32 @@
+import glob
+import json
+import os
+
+import smbios
+
+# Each fixtures/smbios/*.bin is a raw SMBIOS table; the .json next to it holds the modules it should decode to
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'smbios')
+
+failures = 0
+paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.bin')))
+for path in paths:
+    with open(path, 'rb') as f:
+        modules = smbios.memory_devices(f.read())
+    with open(os.path.splitext(path)[0] + '.json', encoding='utf-8') as f:
+        expected = json.load(f)
+    name = os.path.basename(path)
+    if modules == expected:
+        print(f"OK   {name}: {len(modules)} modules, {smbios.summarize_ram_type(modules)}")
+    else:
+        failures += 1
+        print(f"FAIL {name}:")
+        print(f"  got      {json.dumps(modules)}")
+        print(f"  expected {json.dumps(expected)}")
+
+if not paths:
+    print(f"FAILURE: no fixtures in {FIXTURE_DIR}")
+    raise SystemExit(1)
+if failures:
+    print(f"\nFAILURE: {failures} of {len(paths)} SMBIOS tables decoded differently")
+    raise SystemExit(1)
+print(f"\nSUCCESS: all {len(paths)} SMBIOS tables decoded as expected")